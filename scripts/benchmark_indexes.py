@@ -0,0 +1,202 @@
+"""Show query plans and timings for the hot app.py queries, before and after indexes.
+
+Usage:
+    python scripts/benchmark_indexes.py [--rows 20000] [--repeat 30]
+    python scripts/benchmark_indexes.py --database-url mysql://user:pw@host/umuhuza
+
+Without --database-url the script builds a scratch SQLite database from the
+app models, fills it with synthetic orders / inventory / crops / subsidies /
+market prices, strips the model indexes, and prints EXPLAIN output plus the
+median latency of every hot query; it then runs the same `create_missing_indexes`
+used by `flask create-indexes` and prints everything again.
+
+With --database-url it only runs EXPLAIN against that database (read-only),
+which is the quickest way to confirm the indexes are used in production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, desc, text
+from sqlalchemy.orm import Session
+
+# Make the project root importable when run as `python scripts/benchmark_indexes.py`
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app import (  # noqa: E402
+    Crop, Inventory, MarketPrice, Order, Subsidy, User, create_missing_indexes, db,
+)
+from scripts.seed_knowledge_base import normalize_database_url  # noqa: E402
+
+COMMODITIES = ["maize", "beans", "rice", "potatoes", "cassava", "wheat", "sorghum", "bananas"]
+PROVINCES   = ["Kigali", "North", "South", "East", "West"]
+
+
+def hot_queries(session: Session, farmer_id: int, dealer_id: int, processor_id: int):
+    """(label, Query) pairs mirroring the filters/orderings used in app.py."""
+    today = date.today()
+    return [
+        ("orders by dealer",
+         session.query(Order).filter(Order.dealer_id == dealer_id)
+                .order_by(desc(Order.created_at), desc(Order.id)).limit(50)),
+        ("orders by farmer",
+         session.query(Order).filter(Order.farmer_id == farmer_id)
+                .order_by(desc(Order.created_at))),
+        ("orders by processor",
+         session.query(Order).filter(Order.processor_id == processor_id)
+                .order_by(desc(Order.created_at))),
+        ("inventory (dealer, product)",
+         session.query(Inventory).filter(Inventory.dealer_id == dealer_id,
+                                         Inventory.product_name == "product-7")),
+        ("crops (farmer, crop)",
+         session.query(Crop).filter(Crop.farmer_id == farmer_id, Crop.crop_name == "maize")),
+        ("active subsidies",
+         session.query(Subsidy).filter(Subsidy.active == True,  # noqa: E712
+                                       db.or_(Subsidy.valid_to.is_(None), Subsidy.valid_to >= today))),
+        ("market prices page",
+         session.query(MarketPrice).order_by(desc(MarketPrice.date), desc(MarketPrice.id)).limit(50)),
+        ("market prices by commodity",
+         session.query(MarketPrice).filter(MarketPrice.commodity == "maize")
+                .order_by(desc(MarketPrice.date))),
+    ]
+
+
+def explain(session: Session, query) -> str:
+    dialect = session.bind.dialect.name
+    sql     = str(query.statement.compile(dialect=session.bind.dialect,
+                                          compile_kwargs={"literal_binds": True}))
+    prefix  = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows    = session.execute(text(prefix + sql)).fetchall()
+    if dialect == "sqlite":
+        return "; ".join(str(row[-1]) for row in rows)
+    return "\n      ".join(" | ".join(str(v) for v in row) for row in rows)
+
+
+def median_ms(query, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query.all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(session: Session, ids, repeat: int, title: str) -> None:
+    print(f"\n=== {title} ===")
+    for label, query in hot_queries(session, *ids):
+        timing = f"{median_ms(query, repeat):8.2f} ms" if repeat else ""
+        print(f"- {label:28s} {timing}")
+        print(f"      {explain(session, query)}")
+
+
+def populate(session: Session, rows: int) -> tuple:
+    rng   = random.Random(42)
+    users = [User(full_name=f"user {i}", email=f"user{i}@example.test",
+                  role=("farmer", "dealer", "processor")[i % 3], password_hash="x")
+             for i in range(max(30, rows // 100))]
+    session.add_all(users)
+    session.flush()
+    farmers    = [u.id for u in users if u.role == "farmer"]
+    dealers    = [u.id for u in users if u.role == "dealer"]
+    processors = [u.id for u in users if u.role == "processor"]
+    start      = datetime(2024, 1, 1)
+
+    session.bulk_insert_mappings(Order, [{
+        "farmer_id":    rng.choice(farmers),
+        "dealer_id":    rng.choice(dealers),
+        "processor_id": rng.choice(processors) if i % 3 == 0 else None,
+        "product_name": rng.choice(COMMODITIES),
+        "quantity":     rng.randint(1, 500),
+        "status":       "pending",
+        "created_at":   start + timedelta(minutes=i),
+    } for i in range(rows)])
+    session.bulk_insert_mappings(Inventory, [{
+        "dealer_id":    rng.choice(dealers),
+        "product_name": f"product-{i % 200}",
+        "stock":        rng.randint(0, 1000),
+    } for i in range(rows // 2)])
+    session.bulk_insert_mappings(Crop, [{
+        "farmer_id": rng.choice(farmers),
+        "crop_name": rng.choice(COMMODITIES),
+        "quantity":  rng.uniform(10, 1000),
+    } for i in range(rows // 2)])
+    session.bulk_insert_mappings(Subsidy, [{
+        "dealer_id": rng.choice(dealers),
+        "title":     f"subsidy {i}",
+        "active":    i % 4 != 0,
+        "valid_to":  date.today() + timedelta(days=rng.randint(-365, 365)),
+    } for i in range(rows // 4)])
+    session.bulk_insert_mappings(MarketPrice, [{
+        "commodity": rng.choice(COMMODITIES),
+        "price":     rng.uniform(100, 1500),
+        "province":  rng.choice(PROVINCES),
+        "date":      date(2015, 1, 1) + timedelta(days=i // len(PROVINCES)),
+    } for i in range(rows)])
+    session.commit()
+    return farmers[0], dealers[0], processors[0]
+
+
+def scratch_benchmark(rows: int, repeat: int) -> None:
+    path   = Path(tempfile.mkdtemp()) / "index_benchmark.db"
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(bind=conn)
+
+    with Session(engine) as session:
+        print(f"Scratch SQLite database with {rows} orders: {path}")
+        ids = populate(session, rows)
+        report(session, ids, repeat, "BEFORE (primary keys / unique columns only)")
+
+        created = create_missing_indexes(engine)
+        session.execute(text("ANALYZE"))
+        print(f"\nCreated {len(created)} index(es):")
+        for statement in created:
+            print(f"  {statement}")
+        report(session, ids, repeat, "AFTER")
+    engine.dispose()
+    os.remove(path)
+
+
+def explain_only(database_url: str) -> None:
+    engine = create_engine(normalize_database_url(database_url))
+    with Session(engine) as session:
+        first = {role: session.query(User.id).filter(User.role == role).limit(1).scalar() or 0
+                 for role in ("farmer", "dealer", "processor")}
+        report(session, (first["farmer"], first["dealer"], first["processor"]), 0,
+               f"{engine.dialect.name} plans")
+    engine.dispose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN / time the hot app.py queries.")
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic orders to generate.")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per query.")
+    parser.add_argument("--database-url", default=None,
+                        help="Explain against an existing database instead (read-only).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database_url:
+        explain_only(args.database_url)
+    else:
+        scratch_benchmark(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure WeatherService refresh wall time, CPU and connections against a local stub.
+
+Usage:
+    python scripts/benchmark_weather_http.py [--refreshes 5] [--latency 0.02] [--handshake 0.05]
+
+Runs --refreshes forced refreshes (1 forecast + 30 district calls each) twice
+against the fake WeatherAPI from fake_weatherapi.py:
+
+  per-call   a plain `requests.get` per call and a new ThreadPoolExecutor per
+             refresh (how WeatherService used to work)
+  pooled     the service's keep-alive requests.Session and persistent executor
+
+--handshake adds a delay to every new connection on the stub, standing in for
+the TCP+TLS setup to api.weatherapi.com that keep-alive avoids. The report
+shows the median wall time and process CPU per refresh and the number of
+connections the stub accepted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Make the project root importable when run as `python scripts/benchmark_weather_http.py`
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import requests  # noqa: E402
+
+from services.weather import WeatherService  # noqa: E402
+from fake_weatherapi import FakeWeatherAPI  # noqa: E402
+
+
+class PerCallWeatherService(WeatherService):
+    """The previous behaviour: no shared session, a fresh executor per refresh."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._executors = []
+
+    def _session(self):
+        return requests
+
+    def _district_pool(self) -> ThreadPoolExecutor:
+        executor = ThreadPoolExecutor(max_workers=self.MAX_DISTRICT_WORKERS)
+        self._executors.append(executor)
+        return executor
+
+    def finish_refresh(self) -> None:
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+        self._executors.clear()
+
+
+def measure(service: WeatherService, server: FakeWeatherAPI, refreshes: int) -> dict:
+    service.API_URL          = f"{server.base_url}/v1/forecast.json"
+    service.DISTRICT_API_URL = f"{server.base_url}/v1/current.json"
+    walls, cpus = [], []
+    server.reset()
+    for _ in range(refreshes):
+        wall, cpu = time.perf_counter(), time.process_time()
+        payload   = service.get_weather(force_refresh=True)
+        if hasattr(service, "finish_refresh"):
+            service.finish_refresh()
+        walls.append((time.perf_counter() - wall) * 1000)
+        cpus.append((time.process_time() - cpu) * 1000)
+        if payload.get("error"):
+            raise SystemExit(f"refresh failed: {payload['error']}")
+    calls = sum(server.hits.values())
+    return {
+        "wall_ms":     statistics.median(walls),
+        "cpu_ms":      statistics.median(cpus),
+        "calls":       calls,
+        "connections": server.connections,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-call vs pooled WeatherAPI HTTP.")
+    parser.add_argument("--refreshes", type=int, default=5, help="Forced refreshes per mode.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub response latency (s).")
+    parser.add_argument("--handshake", type=float, default=0.05, help="Stub cost per new connection (s).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args   = parse_args(argv)
+    server = FakeWeatherAPI(args.latency, handshake=args.handshake)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{args.refreshes} refreshes, {args.latency:.3f}s latency, "
+          f"{args.handshake:.3f}s per new connection\n")
+    print(f"{'mode':10s} {'wall/refresh':>13s} {'cpu/refresh':>12s} {'calls':>6s} {'connections':>12s}")
+    for label, service in (("per-call", PerCallWeatherService()), ("pooled", WeatherService())):
+        result = measure(service, server, args.refreshes)
+        print(f"{label:10s} {result['wall_ms']:10.1f} ms {result['cpu_ms']:9.1f} ms "
+              f"{result['calls']:6d} {result['connections']:12d}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""A local fake WeatherAPI (forecast.json + current.json) on 127.0.0.1.
+
+Used by scripts/benchmark_weather_http.py and tests/test_weather_singleflight.py.
+It answers every location with the same conditions after `latency` seconds,
+counts hits per path, and can add a `handshake` delay to each new connection.
+
+    server = FakeWeatherAPI(latency=0.2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.API_URL = f"{server.base_url}/v1/forecast.json"
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeWeatherAPI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, handshake: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency     = latency
+        self.handshake   = handshake   # simulated TCP+TLS setup cost per new connection
+        self.hits        = Counter()
+        self.connections = 0
+        self._lock       = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, path: str) -> None:
+        with self._lock:
+            self.hits[path] += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def reset(self) -> Counter:
+        with self._lock:
+            hits, self.hits  = self.hits, Counter()
+            self.connections = 0
+        return hits
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version        = "HTTP/1.1"   # keep-alive, like api.weatherapi.com
+    disable_nagle_algorithm = True         # headers and body go out as separate writes
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.record_connection()
+        time.sleep(self.server.handshake)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url   = urlparse(self.path)
+        query = parse_qs(url.query).get("q", ["Kigali,Rwanda"])[0]
+        self.server.record(url.path)
+        time.sleep(self.server.latency)
+
+        name    = query.split(",")[0]
+        current = {"temp_c": 21.0, "feelslike_c": 21.0, "humidity": 60, "wind_kph": 8.0,
+                   "last_updated": time.strftime("%Y-%m-%d %H:%M"),
+                   "condition": {"text": "Partly cloudy", "icon": "//cdn.example/116.png"}}
+        body = {"location": {"name": name, "region": "", "country": "Rwanda"}, "current": current}
+        if url.path.endswith("forecast.json"):
+            body["forecast"] = {"forecastday": []}
+        data = json.dumps(body).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002 - keep the output readable
+        pass
@@ -1,31 +1,75 @@
 """Seed the UMUHUZA knowledge base with hashing-based embeddings.
 
 Usage:
-    python scripts/seed_knowledge_base.py
+    python scripts/seed_knowledge_base.py [--reembed] [--database-url URL]
+    python scripts/seed_knowledge_base.py --migrate-binary [--dtype float16]
+    python scripts/seed_knowledge_base.py --build-artifact [--artifact-dir DIR]
+
+Seeding is incremental and idempotent: chunks are matched on a sha256 of
+their content, so only new chunks are embedded and inserted, chunks no longer
+in chatbot_knowledge_base.json (and duplicate rows) are deleted, and rows
+whose embedding is missing or has the wrong dimension are re-embedded. All
+changes are applied with executemany in a single transaction, together with
+a bump of the revision row in `knowledge_base_meta` (created on first run)
+that tells running app processes to reload their in-memory index. Pass
+`--reembed` after changing KNOWLEDGE_HASH_MODE or KNOWLEDGE_EMBED_FORMAT to
+rewrite every embedding.
+
+`--build-artifact` needs no database: it compiles the knowledge JSON into
+artifacts/knowledge_embeddings.npy (normalised float32 matrix) plus
+artifacts/knowledge_chunks.json, which the app memory-maps at startup so RAG
+skips the knowledge_base table entirely. Rebuild and commit it whenever the
+JSON, KNOWLEDGE_EMBED_DIM or KNOWLEDGE_HASH_MODE changes.
+
+`--migrate-binary` converts existing JSON embeddings in place to the binary
+column format (16-byte header + little-endian floats), changing the
+`embedding` column to LONGBLOB (MySQL) or BYTEA (PostgreSQL); other
+backends are refused before anything is changed. Run it once before seeding with a
+`binary*` KNOWLEDGE_EMBED_FORMAT.
 
 Environment variables:
+    DATABASE_URL           - SQLAlchemy URL (MySQL or PostgreSQL), as used by
+                             app.py; when unset, the MYSQL_* settings below
+                             are used with mysql.connector
     MYSQL_HOST             - default: localhost
     MYSQL_PORT             - default: 3306
     MYSQL_USER             - default: root
     MYSQL_PASSWORD         - default: (empty)
     MYSQL_DATABASE         - default: umuhuza
     KNOWLEDGE_EMBED_DIM    - default: 4096
+    KNOWLEDGE_EMBED_FORMAT - sparse (default), dense, binary32, binary16 or
+                             binary-sparse (binary formats need a BLOB column)
+    KNOWLEDGE_HASH_MODE    - sha256 (default) or fast; the app must use the same
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import os
+import sys
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
-import mysql.connector
-import numpy as np
 from dotenv import load_dotenv
 
-from services.embeddings import get_embed_dim_from_env, hash_embed
-
+# Make the project root importable when run as `python scripts/seed_knowledge_base.py`
 ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from services.embeddings import (
+    SparseVector,
+    decode_embedding,
+    encode_embedding_binary,
+    encode_embeddings,
+    get_embed_dim_from_env,
+    get_embed_format_from_env,
+    is_binary_embedding,
+)
+from services.knowledge_index import write_artifact
+
 KNOWLEDGE_FILE = ROOT_DIR / "chatbot_knowledge_base.json"
 
 
@@ -65,7 +109,41 @@ def load_chunks() -> List[str]:
     return ordered_chunks
 
 
-def connect_db():
+def normalize_database_url(url: str) -> str:
+    """Apply the same driver/SSL-parameter rewrites app.py does to DATABASE_URL."""
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    if not url.startswith("mysql://"):
+        return url
+
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+    parts = urlsplit(url.replace("mysql://", "mysql+pymysql://", 1))
+    filtered = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in ("ssl-mode", "ssl_mode", "sslmode")
+    ]
+    return urlunsplit(
+        (parts.scheme, parts.netloc, parts.path, urlencode(filtered), parts.fragment)
+    )
+
+
+def connect_db(database_url: Optional[str] = None):
+    """DB-API connection from a SQLAlchemy URL, or mysql.connector from MYSQL_*."""
+    if database_url:
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        url = normalize_database_url(database_url)
+        connect_args = {"connect_timeout": 10}
+        if url.startswith("mysql+pymysql://") and database_url.startswith("mysql://"):
+            # Hosted MySQL (DATABASE_URL) needs TLS, same as app.py
+            connect_args["ssl"] = {"ssl_mode": "VERIFY_IDENTITY", "check_hostname": False}
+        engine = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+        return engine.raw_connection()
+
+    import mysql.connector
+
     return mysql.connector.connect(
         host=os.getenv("MYSQL_HOST", "localhost"),
         port=int(os.getenv("MYSQL_PORT", "3306")),
@@ -75,34 +153,263 @@ def connect_db():
     )
 
 
-def main():
-    load_dotenv()
+def content_hash(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def bump_revision(cursor) -> None:
+    """Bump the revision row the app's in-memory index polls for changes."""
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS knowledge_base_meta ("
+        "name VARCHAR(64) PRIMARY KEY, revision BIGINT NOT NULL)"
+    )
+    cursor.execute(
+        "UPDATE knowledge_base_meta SET revision = revision + 1 WHERE name = 'knowledge_base'"
+    )
+    if cursor.rowcount == 0:
+        cursor.execute(
+            "INSERT INTO knowledge_base_meta (name, revision) VALUES ('knowledge_base', 1)"
+        )
+
+
+def _needs_embedding(payload, dim: int) -> bool:
+    vector = decode_embedding(payload) if payload else None
+    if vector is None:
+        return True
+    return (vector.dim if isinstance(vector, SparseVector) else vector.shape[0]) != dim
+
+
+def sync_knowledge_base(
+    db, chunks: List[str], dim: int, fmt: str, reembed: bool = False
+) -> Dict[str, int]:
+    """Bring knowledge_base in line with `chunks` in one transaction."""
+    wanted = {content_hash(chunk): chunk for chunk in chunks}
 
-    dim = get_embed_dim_from_env()
-    db = connect_db()
     cursor = db.cursor()
+    cursor.execute("SELECT id, content, embedding FROM knowledge_base ORDER BY id")
+    rows = cursor.fetchall()
+
+    kept: Dict[str, int] = {}
+    stale: List[tuple] = []
+    deletes: List[tuple] = []
+    for row_id, content, payload in rows:
+        digest = content_hash(content or "")
+        if digest not in wanted or digest in kept:
+            deletes.append((row_id,))
+            continue
+        kept[digest] = row_id
+        if reembed or _needs_embedding(payload, dim):
+            stale.append((row_id, wanted[digest]))
+
+    new_chunks = [chunk for digest, chunk in wanted.items() if digest not in kept]
+    inserts = list(zip(new_chunks, encode_embeddings(new_chunks, dim, fmt)))
+    stale_embeddings = encode_embeddings([chunk for _, chunk in stale], dim, fmt)
+    updates = [(embedding, row_id) for embedding, (row_id, _) in zip(stale_embeddings, stale)]
+
+    try:
+        if deletes:
+            cursor.executemany("DELETE FROM knowledge_base WHERE id = %s", deletes)
+        if updates:
+            cursor.executemany("UPDATE knowledge_base SET embedding = %s WHERE id = %s", updates)
+        if inserts:
+            cursor.executemany(
+                "INSERT INTO knowledge_base (content, embedding) VALUES (%s, %s)", inserts
+            )
+        if deletes or updates or inserts:
+            bump_revision(cursor)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return {
+        "inserted":  len(inserts),
+        "updated":   len(updates),
+        "deleted":   len(deletes),
+        "unchanged": len(kept) - len(updates),
+    }
+
+
+# Per-backend SQL for --migrate-binary (the DB-API paramstyle is %s for both drivers)
+MIGRATE_SQL = {
+    "mysql": {
+        "schema":      "DATABASE()",
+        "binary_type": "LONGBLOB",
+        "swap": [
+            "ALTER TABLE knowledge_base "
+            "DROP COLUMN embedding, "
+            "CHANGE COLUMN embedding_bin embedding LONGBLOB NULL",
+        ],
+    },
+    "postgresql": {
+        "schema":      "current_schema()",
+        "binary_type": "BYTEA",
+        "swap": [
+            "ALTER TABLE knowledge_base DROP COLUMN embedding",
+            "ALTER TABLE knowledge_base RENAME COLUMN embedding_bin TO embedding",
+        ],
+    },
+}
+
+
+def database_backend(database_url: Optional[str]) -> str:
+    """Backend name for `database_url` (mysql when falling back to the MYSQL_* settings)."""
+    if not database_url:
+        return "mysql"
+    from sqlalchemy.engine import make_url
+
+    return make_url(normalize_database_url(database_url)).get_backend_name()
+
+
+def _embedding_column_type(cursor, backend: str = "mysql") -> str:
+    cursor.execute(
+        "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = {MIGRATE_SQL[backend]['schema']} "
+        "AND TABLE_NAME = 'knowledge_base' AND COLUMN_NAME = 'embedding'"
+    )
+    row = cursor.fetchone()
+    return (row[0] if row else "").lower()
+
+
+def _binary_updates(rows, dtype: str) -> List[tuple]:
+    """(binary_payload, id) pairs for every row still holding a JSON embedding."""
+    updates: List[tuple] = []
+    for row_id, payload in rows:
+        if not payload or is_binary_embedding(payload):
+            continue
+        vector = decode_embedding(payload)
+        if vector is None:
+            continue
+        if isinstance(vector, SparseVector):
+            updates.append((encode_embedding_binary(vector), row_id))
+        else:
+            updates.append((encode_embedding_binary(vector, dtype), row_id))
+    return updates
+
+
+def migrate_to_binary(db, dtype: str = "float32", backend: str = "mysql") -> None:
+    """Convert JSON embeddings to the binary format and retype the column."""
+    if backend not in MIGRATE_SQL:
+        raise RuntimeError(
+            f"--migrate-binary supports MySQL and PostgreSQL, not {backend}."
+        )
+    sql    = MIGRATE_SQL[backend]
+    cursor = db.cursor()
+    column_type = _embedding_column_type(cursor, backend)
+    if not column_type:
+        raise RuntimeError("knowledge_base.embedding column not found.")
+
+    cursor.execute("SELECT id, embedding FROM knowledge_base")
+    rows = cursor.fetchall()
+    updates = _binary_updates(rows, dtype)
+
+    if column_type.endswith("blob") or column_type == "bytea":
+        # Column already binary: only rows still holding JSON text are rewritten
+        if updates:
+            cursor.executemany(
+                "UPDATE knowledge_base SET embedding = %s WHERE id = %s", updates
+            )
+        db.commit()
+    else:
+        # JSON columns cannot hold raw bytes: fill a BLOB column, then swap it in
+        cursor.execute(
+            f"ALTER TABLE knowledge_base ADD COLUMN embedding_bin {sql['binary_type']} NULL"
+        )
+        if updates:
+            cursor.executemany(
+                "UPDATE knowledge_base SET embedding_bin = %s WHERE id = %s", updates
+            )
+        db.commit()
+        for statement in sql["swap"]:
+            cursor.execute(statement)
+        db.commit()
+    bump_revision(cursor)
+    db.commit()
+
+    cursor.close()
+    skipped = len(rows) - len(updates)
+    print(f"Converted {len(updates)} embedding(s) to binary ({dtype}); {skipped} row(s) left as-is.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed or migrate the UMUHUZA knowledge base.")
+    parser.add_argument(
+        "--migrate-binary",
+        action="store_true",
+        help="Convert existing JSON embeddings to the binary column format and exit.",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=("float32", "float16"),
+        default="float32",
+        help="Float width for migrated dense embeddings (sparse rows keep float32 weights).",
+    )
+    parser.add_argument(
+        "--reembed",
+        action="store_true",
+        help="Rewrite every embedding (after changing KNOWLEDGE_HASH_MODE or KNOWLEDGE_EMBED_FORMAT).",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy database URL; defaults to DATABASE_URL, then the MYSQL_* settings.",
+    )
+    parser.add_argument(
+        "--build-artifact",
+        action="store_true",
+        help="Write the memory-mappable embedding artifact instead of touching the database.",
+    )
+    parser.add_argument(
+        "--artifact-dir",
+        default=None,
+        help="Output directory for --build-artifact (default: KNOWLEDGE_ARTIFACT_DIR or ./artifacts).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_dotenv()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+
+    if args.migrate_binary:
+        backend = database_backend(database_url)
+        if backend not in MIGRATE_SQL:
+            sys.exit(f"--migrate-binary supports MySQL and PostgreSQL databases, not {backend}.")
+        db = connect_db(database_url)
+        try:
+            migrate_to_binary(db, args.dtype, backend)
+        finally:
+            db.close()
+        return
 
     chunks = load_chunks()
     if not chunks:
         print("No knowledge snippets found; aborting.")
         return
 
-    print(f"Seeding {len(chunks)} snippets into knowledge_base...")
+    dim = get_embed_dim_from_env()
+    if args.build_artifact:
+        directory = write_artifact(chunks, dim, args.artifact_dir)
+        print(f"Wrote {len(chunks)} snippets ({dim} dims) to {directory}.")
+        return
 
-    for idx, chunk in enumerate(chunks, start=1):
-        vector = hash_embed(chunk, dim)
-        embedding = np.asarray(vector, dtype=float).tolist()
+    fmt = get_embed_format_from_env()
+    print(f"Syncing {len(chunks)} snippets into knowledge_base ({fmt} embeddings)...")
 
-        cursor.execute(
-            "INSERT INTO knowledge_base (content, embedding) VALUES (%s, %s)",
-            (chunk, json.dumps(embedding)),
-        )
-        print(f"[{idx}/{len(chunks)}] inserted.")
+    db = connect_db(database_url)
+    try:
+        counts = sync_knowledge_base(db, chunks, dim, fmt, reembed=args.reembed)
+    finally:
+        db.close()
 
-    db.commit()
-    cursor.close()
-    db.close()
-    print("Knowledge base seed complete.")
+    print(
+        "Knowledge base sync complete: "
+        f"{counts['inserted']} inserted, {counts['updated']} re-embedded, "
+        f"{counts['deleted']} deleted, {counts['unchanged']} unchanged."
+    )
 
 
 if __name__ == "__main__":
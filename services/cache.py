@@ -0,0 +1,103 @@
+"""
+services/cache.py
+Small in-process TTL cache for shared, read-mostly dashboard data
+(role counts, market price pages, the public inventory catalog).
+Entries are grouped by namespace so write routes can drop everything a
+change affects; the TTL bounds staleness across separate workers/instances.
+Place this file at:  services/cache.py
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = 60.0
+DEFAULT_CAPACITY    = 256
+
+
+def get_cache_ttl_from_env() -> float:
+    """Read DASHBOARD_CACHE_TTL_SECONDS (0 disables caching)."""
+    raw = os.getenv("DASHBOARD_CACHE_TTL_SECONDS")
+    if raw:
+        try:
+            value = float(raw)
+            if value >= 0:
+                return value
+        except ValueError:
+            pass
+    return DEFAULT_TTL_SECONDS
+
+
+class TTLCache:
+    """Thread-safe LRU map of (namespace, *key) -> value with per-entry expiry."""
+
+    def __init__(self, ttl: Optional[float] = None, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.ttl           = get_cache_ttl_from_env() if ttl is None else ttl
+        self.capacity      = capacity
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock         = threading.Lock()
+        self.hits          = 0
+        self.misses        = 0
+        self.invalidations = 0
+        self._generations: Dict[str, int] = {}
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Cached value, or loader() stored for `ttl` seconds (loader errors are not cached)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return loader()
+
+        full_key = (namespace, key)
+        now      = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(namespace, 0)
+
+        value = loader()
+        with self._lock:
+            # Invalidated while loading: serve this value but don't cache it
+            if self._generations.get(namespace, 0) != generation:
+                return value
+            self._entries[full_key] = (now + ttl, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every entry in the given namespaces (all entries when none given)."""
+        with self._lock:
+            affected = namespaces or tuple({k[0] for k in self._entries} | set(self._generations))
+            for namespace in affected:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for full_key in [k for k in self._entries if k[0] in affected]:
+                del self._entries[full_key]
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "hit_rate":      round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "entries":       len(self._entries),
+            "ttl_seconds":   self.ttl,
+        }
+
+
+# Module-level singleton — shared by every request in this process
+dashboard_cache = TTLCache()
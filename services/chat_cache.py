@@ -0,0 +1,409 @@
+"""
+services/chat_cache.py
+Answer cache for the UMUHUZA assistant.
+Repeated questions are answered without a Groq round trip. Entries are keyed
+on the normalised message, the retrieved chunk ids, the model/temperature and
+the recent history, and live in an in-process TTL/LRU store with an optional
+shared SQL store (SQLite file or the app database) for serverless instances.
+A semantic layer additionally reuses answers for near-duplicate questions.
+Place this file at:  services/chat_cache.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+# ---------------------------------------------------------------------------
+# Safe import of numpy + hashed embeddings (only needed for the semantic cache)
+# ---------------------------------------------------------------------------
+try:
+    import numpy as np
+    from services.embeddings import hash_embed, tokenize
+    _SEMANTIC_AVAILABLE = True
+except (ModuleNotFoundError, ImportError):
+    np = None  # type: ignore
+    _SEMANTIC_AVAILABLE = False
+
+# ---------------------------------------------------------------------------
+# Safe import of SQLAlchemy Core (only needed for the shared backend)
+# ---------------------------------------------------------------------------
+try:
+    from sqlalchemy import (
+        Column, Float, MetaData, String, Table, Text, create_engine, delete, select, update,
+    )
+    from sqlalchemy.exc import IntegrityError
+    _SQLALCHEMY_AVAILABLE = True
+except ModuleNotFoundError:
+    _SQLALCHEMY_AVAILABLE = False
+
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_CAPACITY    = 512
+
+DEFAULT_SEMANTIC_CAPACITY  = 256
+DEFAULT_SEMANTIC_DIM       = 1024
+# Hashed word/trigram vectors put "register as a farmer" and "... as a dealer"
+# around 0.83, so only near-identical wording may reuse an answer
+DEFAULT_SEMANTIC_THRESHOLD = 0.95
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", (message or "").strip().lower()).rstrip(" ?!.")
+
+
+def _history_digest(history: Optional[List[Dict[str, str]]]) -> List[List[str]]:
+    # Mirrors _build_messages: only the last 6 user/assistant turns reach the model
+    digest: List[List[str]] = []
+    for item in (history or [])[-6:]:
+        role    = item.get("role")
+        content = (item.get("content") or "").strip()
+        if role in {"user", "assistant"} and content:
+            digest.append([role, normalize_message(content)])
+    return digest
+
+
+class MemoryAnswerStore:
+    """Thread-safe in-process store with per-entry TTL and LRU eviction."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity  = max(1, capacity)
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def set(self, key: str, answer: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (answer, time.time() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLAnswerStore:
+    """Shared store in a `chat_answer_cache` table (SQLite file, MySQL or Postgres)."""
+
+    PURGE_EVERY = 50
+
+    def __init__(self, engine) -> None:
+        if not _SQLALCHEMY_AVAILABLE:
+            raise RuntimeError("SQLAlchemy is required for the shared answer cache.")
+        self.engine   = engine
+        self.metadata = MetaData()
+        self.table    = Table(
+            "chat_answer_cache", self.metadata,
+            Column("cache_key",  String(64), primary_key=True),
+            Column("answer",     Text,       nullable=False),
+            Column("expires_at", Float,      nullable=False, index=True),
+        )
+        self.metadata.create_all(engine, checkfirst=True)
+        self._writes = 0
+
+    @classmethod
+    def from_sqlite_path(cls, path: str) -> "SQLAnswerStore":
+        return cls(create_engine(f"sqlite:///{path}", connect_args={"timeout": 5}))
+
+    def get(self, key: str) -> Optional[str]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(self.table.c.answer, self.table.c.expires_at)
+                .where(self.table.c.cache_key == key)
+            ).first()
+        if row is None or row.expires_at <= time.time():
+            return None
+        return row.answer
+
+    def set(self, key: str, answer: str, ttl_seconds: float) -> None:
+        values = {"answer": answer, "expires_at": time.time() + ttl_seconds}
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                update(self.table).where(self.table.c.cache_key == key).values(**values)
+            ).rowcount
+            if not updated:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(self.table.insert().values(cache_key=key, **values))
+                except IntegrityError:
+                    # Another instance inserted the same answer concurrently
+                    pass
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute(delete(self.table).where(self.table.c.expires_at <= time.time()))
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table))
+
+
+class AnswerCache:
+    """Two-level answer cache with hit/miss counters."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        capacity: int = DEFAULT_CAPACITY,
+        shared: Optional[Any] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.enabled     = enabled
+        self.memory      = MemoryAnswerStore(capacity)
+        self.shared      = shared
+        self._lock       = threading.Lock()
+        self._counters   = {"hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(
+        message: str,
+        chunk_ids: Sequence[int],
+        model: str,
+        temperature: float,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> str:
+        material = json.dumps(
+            [normalize_message(message), list(chunk_ids), model, round(float(temperature), 3),
+             _history_digest(history)],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def use_shared_backend(self, shared: Optional[Any]) -> None:
+        self.shared = shared
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        answer = self.memory.get(key)
+        if answer is not None:
+            self._count("hits")
+            return answer
+        if self.shared is not None:
+            try:
+                answer = self.shared.get(key)
+            except Exception:
+                # The shared store is an optimisation — fall through to the LLM
+                self._count("errors")
+                answer = None
+            if answer is not None:
+                self.memory.set(key, answer, self.ttl_seconds)
+                self._count("shared_hits")
+                return answer
+        self._count("misses")
+        return None
+
+    def set(self, key: str, answer: str) -> None:
+        if not self.enabled or not answer:
+            return
+        self.memory.set(key, answer, self.ttl_seconds)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, answer, self.ttl_seconds)
+            except Exception:
+                self._count("errors")
+        self._count("stores")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["shared_hits"] + counters["misses"]
+        return {
+            **counters,
+            "enabled":   self.enabled,
+            "hit_rate":  round((counters["hits"] + counters["shared_hits"]) / lookups, 4) if lookups else 0.0,
+            "entries":   len(self.memory),
+            "evictions": self.memory.evictions,
+            "shared":    type(self.shared).__name__ if self.shared is not None else None,
+        }
+
+
+def semantic_scope(model: str, temperature: float, chunk_ids: Sequence[int]) -> str:
+    """Semantic hits must share the model settings and the exact retrieved grounding."""
+    return f"{model}|{float(temperature):.3f}|{','.join(str(i) for i in sorted(chunk_ids))}"
+
+
+def semantic_text(message: str) -> str:
+    """Words plus padded character trigrams, so typos still share most buckets."""
+    words = tokenize(normalize_message(message))
+    grams: List[str] = []
+    for word in words:
+        padded = f"_{word}_"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return " ".join(words + grams)
+
+
+class SemanticAnswerCache:
+    """Bounded matrix of question embeddings answering near-duplicate questions.
+
+    A lookup is one mat-vec product over at most `capacity` rows; the best row
+    wins when its cosine similarity reaches `threshold`. When full, the least
+    frequently hit entry is evicted (least recently used breaks ties).
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_SEMANTIC_CAPACITY,
+        dim: int = DEFAULT_SEMANTIC_DIM,
+        threshold: float = DEFAULT_SEMANTIC_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled     = enabled and _SEMANTIC_AVAILABLE
+        self.capacity    = max(1, capacity)
+        self.dim         = dim
+        self.threshold   = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock       = threading.Lock()
+        self._answers: List[Optional[str]] = [None] * self.capacity
+        self._scopes:  List[Optional[str]] = [None] * self.capacity
+        if self.enabled:
+            self._matrix    = np.zeros((self.capacity, dim), dtype=np.float32)
+            self._hits      = np.zeros(self.capacity, dtype=np.int64)
+            self._last_used = np.zeros(self.capacity, dtype=np.float64)
+            self._expires   = np.zeros(self.capacity, dtype=np.float64)
+        self._counters = {"lookups": 0, "hits": 0, "stores": 0, "evictions": 0}
+
+    def embed(self, message: str):
+        return hash_embed(semantic_text(message), self.dim) if self.enabled else None
+
+    def _live_mask(self, scope: str, now: float) -> "np.ndarray":
+        same_scope = np.fromiter((s == scope for s in self._scopes), dtype=bool, count=self.capacity)
+        return same_scope & (self._expires > now)
+
+    def lookup(self, query_vector, scope: str) -> Optional[str]:
+        if not self.enabled or query_vector is None or not np.any(query_vector):
+            return None
+        now = time.time()
+        with self._lock:
+            self._counters["lookups"] += 1
+            live = self._live_mask(scope, now)
+            if not live.any():
+                return None
+            scores = np.where(live, self._matrix @ query_vector, -1.0)
+            best   = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._hits[best]     += 1
+            self._last_used[best] = now
+            self._counters["hits"] += 1
+            return self._answers[best]
+
+    def store(self, query_vector, scope: str, answer: str) -> None:
+        if not self.enabled or query_vector is None or not answer or not np.any(query_vector):
+            return
+        now = time.time()
+        with self._lock:
+            live = self._live_mask(scope, now)
+            scores = np.where(live, self._matrix @ query_vector, -1.0)
+            best   = int(np.argmax(scores))
+            if scores[best] >= 0.999:
+                slot = best  # same question again: refresh in place
+            else:
+                free = np.flatnonzero(self._expires <= now)
+                if free.shape[0]:
+                    slot = int(free[0])
+                else:
+                    # LFU, ties broken by least recent use
+                    slot = int(np.lexsort((self._last_used, self._hits))[0])
+                    self._counters["evictions"] += 1
+                self._hits[slot] = 0
+            self._matrix[slot]    = query_vector
+            self._answers[slot]   = answer
+            self._scopes[slot]    = scope
+            self._last_used[slot] = now
+            self._expires[slot]   = now + self.ttl_seconds
+            self._counters["stores"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._answers = [None] * self.capacity
+            self._scopes  = [None] * self.capacity
+            if self.enabled:
+                self._matrix[:]  = 0.0
+                self._hits[:]    = 0
+                self._expires[:] = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries  = int((self._expires > time.time()).sum()) if self.enabled else 0
+        return {
+            **counters,
+            "enabled":         self.enabled,
+            "saved_llm_calls": counters["hits"],
+            "hit_rate":        round(counters["hits"] / counters["lookups"], 4) if counters["lookups"] else 0.0,
+            "entries":         entries,
+            "capacity":        self.capacity,
+            "threshold":       self.threshold,
+        }
+
+
+def semantic_cache_from_env() -> SemanticAnswerCache:
+    """Build the semantic cache from CHAT_SEMANTIC_* environment variables."""
+    enabled = os.getenv("CHAT_SEMANTIC_CACHE_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    try:
+        capacity  = int(os.getenv("CHAT_SEMANTIC_CACHE_SIZE", DEFAULT_SEMANTIC_CAPACITY))
+        threshold = float(os.getenv("CHAT_SEMANTIC_THRESHOLD", DEFAULT_SEMANTIC_THRESHOLD))
+        ttl       = float(os.getenv("CHAT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    except ValueError:
+        capacity, threshold, ttl = (
+            DEFAULT_SEMANTIC_CAPACITY, DEFAULT_SEMANTIC_THRESHOLD, DEFAULT_TTL_SECONDS
+        )
+    return SemanticAnswerCache(
+        capacity=capacity, threshold=threshold, ttl_seconds=ttl, enabled=enabled
+    )
+
+
+def answer_cache_from_env() -> AnswerCache:
+    """Build the cache from CHAT_CACHE_* environment variables."""
+    enabled  = os.getenv("CHAT_CACHE_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    try:
+        ttl      = float(os.getenv("CHAT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        capacity = int(os.getenv("CHAT_CACHE_SIZE", DEFAULT_CAPACITY))
+    except ValueError:
+        ttl, capacity = DEFAULT_TTL_SECONDS, DEFAULT_CAPACITY
+
+    shared = None
+    sqlite_path = os.getenv("CHAT_CACHE_SQLITE_PATH")
+    if enabled and sqlite_path and _SQLALCHEMY_AVAILABLE:
+        try:
+            shared = SQLAnswerStore.from_sqlite_path(sqlite_path)
+        except Exception:
+            shared = None
+    return AnswerCache(ttl_seconds=ttl, capacity=capacity, shared=shared, enabled=enabled)
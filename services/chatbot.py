@@ -5,9 +5,8 @@ Safe to import even when groq is not yet installed (returns a clear error messag
 Place this file at:  services/chatbot.py
 """
 
-import json
 import os
-from typing import Dict, List, Sequence, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
 
 # ---------------------------------------------------------------------------
 # Safe import of groq — gives a clear error on first call if missing
@@ -29,22 +28,11 @@ except ModuleNotFoundError:
     np = None  # type: ignore
     _NUMPY_AVAILABLE = False
 
-# ---------------------------------------------------------------------------
-# Safe import of SQLAlchemy Session (only needed at runtime, not import time)
-# ---------------------------------------------------------------------------
-try:
-    from sqlalchemy import text
-    from sqlalchemy.orm import Session
-    _SQLALCHEMY_AVAILABLE = True
-except ModuleNotFoundError:
-    Session = None  # type: ignore
-    _SQLALCHEMY_AVAILABLE = False
-
 # ---------------------------------------------------------------------------
 # Safe import of embeddings helper
 # ---------------------------------------------------------------------------
 try:
-    from services.embeddings import get_embed_dim_from_env, hash_embed
+    from services.embeddings import get_embed_dim_from_env, hash_embed, hash_embed_sparse
     _EMBEDDINGS_AVAILABLE = True
 except (ModuleNotFoundError, ImportError):
     _EMBEDDINGS_AVAILABLE = False
@@ -65,6 +53,19 @@ except (ModuleNotFoundError, ImportError):
         return []
 
 
+# ---------------------------------------------------------------------------
+# Process-wide knowledge index and answer cache (optional imports guarded inside)
+# ---------------------------------------------------------------------------
+from services.knowledge_index import SearchHit, knowledge_index
+from services.chat_cache import (
+    AnswerCache,
+    SemanticAnswerCache,
+    answer_cache_from_env,
+    semantic_cache_from_env,
+    semantic_scope,
+)
+
+
 # ---------------------------------------------------------------------------
 # Prompts & defaults
 # ---------------------------------------------------------------------------
@@ -83,6 +84,24 @@ SYSTEM_PROMPT = (
 
 DEFAULT_GROQ_MODEL = "llama-3.1-8b-instant"
 
+# Retrieval: hashed-vector cosine, BM25 over posting lists, or a fusion of both
+RETRIEVAL_MODES        = ("vector", "bm25", "hybrid")
+DEFAULT_RETRIEVAL_MODE = "vector"
+DEFAULT_HYBRID_ALPHA   = 0.5
+
+
+def _retrieval_mode_from_env() -> str:
+    raw = (os.getenv("CHAT_RETRIEVAL_MODE") or "").strip().lower()
+    return raw if raw in RETRIEVAL_MODES else DEFAULT_RETRIEVAL_MODE
+
+
+def _hybrid_alpha_from_env() -> float:
+    try:
+        value = float(os.getenv("CHAT_HYBRID_ALPHA", DEFAULT_HYBRID_ALPHA))
+    except ValueError:
+        return DEFAULT_HYBRID_ALPHA
+    return min(max(value, 0.0), 1.0)
+
 
 # ---------------------------------------------------------------------------
 # Custom exceptions
@@ -95,12 +114,36 @@ class RateLimitExceededError(RuntimeError):
     """Raised when the chat model reports a rate/usage limit."""
 
 
+class _PreparedChat(NamedTuple):
+    cache_key:       str
+    cached:          Optional[str]
+    messages:        List[Dict[str, str]]
+    model:           str
+    temperature:     float
+    semantic_vector: object
+    semantic_scope:  str
+
+
 # ---------------------------------------------------------------------------
 # Main assistant class
 # ---------------------------------------------------------------------------
 class UmuhuzaAssistant:
-    def __init__(self):
+    def __init__(
+        self,
+        retrieval_mode: Optional[str] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        semantic_cache: Optional[SemanticAnswerCache] = None,
+    ):
         self._client: Optional[object] = None
+        mode = (retrieval_mode or _retrieval_mode_from_env()).lower()
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {RETRIEVAL_MODES}.")
+        self.retrieval_mode = mode
+        self.hybrid_alpha   = _hybrid_alpha_from_env()
+        self.answer_cache   = answer_cache if answer_cache is not None else answer_cache_from_env()
+        self.semantic_cache = (
+            semantic_cache if semantic_cache is not None else semantic_cache_from_env()
+        )
 
     def _get_client(self):
         """Lazily initialise the Groq client."""
@@ -143,104 +186,199 @@ class UmuhuzaAssistant:
         messages.append({"role": "user", "content": prompt})
         return messages
 
-    def _fetch_context_chunks(
+    def _embed_query(self, question: str, embed_dim: int):
+        if _EMBEDDINGS_AVAILABLE:
+            # Sparse query: scoring touches only the question's non-zero buckets
+            query_vector = hash_embed_sparse(question, embed_dim)
+            return query_vector if query_vector.nnz else None
+        query_vector = hash_embed(question, embed_dim)
+        if not hasattr(query_vector, '__len__') or len(query_vector) == 0:
+            return None
+        return query_vector
+
+    def _retrieve(
         self,
         session,
         question: str,
         top_k: int = 3,
-    ) -> Sequence[str]:
-        """Retrieve the most relevant knowledge base chunks via cosine similarity."""
-        if session is None or not question.strip():
-            return []
-        if not _NUMPY_AVAILABLE or not _SQLALCHEMY_AVAILABLE:
+    ) -> List[SearchHit]:
+        """Retrieve the best knowledge base hits using the configured retrieval mode."""
+        question = question.strip()
+        if not question or not _NUMPY_AVAILABLE:
             return []
 
         try:
             embed_dim = get_embed_dim_from_env()
-            query_vector = hash_embed(question.strip(), embed_dim)
-            if not hasattr(query_vector, '__len__') or len(query_vector) == 0:
-                return []
 
-            rows = session.execute(
-                text(
-                    "SELECT content, embedding "
-                    "FROM knowledge_base "
-                    "WHERE embedding IS NOT NULL"
-                )
-            )
+            # Shipped artifact (no DB at all) or one cheap version check,
+            # then in-memory scoring only
+            knowledge_index.ensure_fresh(session, embed_dim)
 
-            scored_chunks: List[tuple] = []
-            for content, embedding_payload in rows:
-                if not content or not embedding_payload:
-                    continue
-                if isinstance(embedding_payload, str):
-                    try:
-                        embedding_payload = json.loads(embedding_payload)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-
-                chunk_vector = np.array(embedding_payload, dtype=np.float32)
-                if chunk_vector.size == 0:
-                    continue
+            if self.retrieval_mode == "bm25":
+                return knowledge_index.search_lexical(question, top_k)
 
-                denominator = np.linalg.norm(query_vector) * np.linalg.norm(chunk_vector)
-                if denominator == 0:
-                    continue
-
-                similarity = float(np.dot(query_vector, chunk_vector) / denominator)
-                scored_chunks.append((content, similarity))
-
-            scored_chunks.sort(key=lambda item: item[1], reverse=True)
-            return [chunk for chunk, _ in scored_chunks[:top_k]]
+            query_vector = self._embed_query(question, embed_dim)
+            if query_vector is None:
+                return []
+            if self.retrieval_mode == "hybrid":
+                return knowledge_index.search_hybrid(
+                    query_vector, question, top_k, alpha=self.hybrid_alpha
+                )
+            return knowledge_index.search(query_vector, top_k)
 
         except Exception:
             # RAG is best-effort — never crash the whole chatbot over a DB error
             return []
 
-    def generate(
+    def _fetch_context_chunks(
+        self,
+        session,
+        question: str,
+        top_k: int = 3,
+    ) -> Sequence[str]:
+        """Retrieve the most relevant knowledge base chunks via the in-memory index."""
+        return [hit.content for hit in self._retrieve(session, question, top_k)]
+
+    def _prepare(
         self,
         user_message: str,
-        history: Optional[List[Dict[str, str]]] = None,
-        session=None,
-    ) -> str:
+        history: Optional[List[Dict[str, str]]],
+        session,
+    ) -> _PreparedChat:
+        """Retrieval, cache lookup and prompt assembly shared by both reply paths."""
         if not user_message.strip():
             raise ValueError("User message is empty.")
 
-        client = self._get_client()
         chat_history = history or []
 
-        knowledge_chunks = self._fetch_context_chunks(session, user_message)
-        knowledge_context = "\n\n".join(knowledge_chunks) if knowledge_chunks else None
+        hits = self._retrieve(session, user_message)
+        knowledge_context = "\n\n".join(hit.content for hit in hits) if hits else None
+
+        groq_model   = os.getenv("GROQ_MODEL", DEFAULT_GROQ_MODEL)
+        temperature  = float(os.getenv("GROQ_TEMPERATURE", "0.4"))
+
+        # Repeated questions with the same context skip the Groq round trip
+        cache_key = self.answer_cache.make_key(
+            user_message, [hit.chunk_id for hit in hits], groq_model, temperature, chat_history
+        )
+        cached = self.answer_cache.get(cache_key)
+
+        # Near-duplicate questions, only on the user's first turn — earlier user
+        # turns can change what the question means
+        first_turn      = not any(item.get("role") == "user" for item in chat_history)
+        scope           = semantic_scope(groq_model, temperature, [hit.chunk_id for hit in hits])
+        semantic_vector = self.semantic_cache.embed(user_message) if first_turn else None
+        if cached is None and semantic_vector is not None:
+            cached = self.semantic_cache.lookup(semantic_vector, scope)
 
         messages = self._build_messages(
             chat_history,
             user_message.strip(),
             knowledge_context=knowledge_context,
         )
+        return _PreparedChat(
+            cache_key, cached, messages, groq_model, temperature, semantic_vector, scope
+        )
 
-        groq_model   = os.getenv("GROQ_MODEL", DEFAULT_GROQ_MODEL)
-        temperature  = float(os.getenv("GROQ_TEMPERATURE", "0.4"))
+    def _remember(self, prepared: _PreparedChat, content: str) -> None:
+        self.answer_cache.set(prepared.cache_key, content)
+        self.semantic_cache.store(prepared.semantic_vector, prepared.semantic_scope, content)
+
+    @staticmethod
+    def _completion_error(exc: Exception) -> RuntimeError:
+        error_message = str(exc).lower()
+        if "rate limit" in error_message or "rate_limit" in error_message:
+            return RateLimitExceededError("Groq rate limit reached. Please try again shortly.")
+        return RuntimeError("The UMUHUZA assistant is temporarily unavailable.")
+
+    def generate(
+        self,
+        user_message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        session=None,
+    ) -> str:
+        prepared = self._prepare(user_message, history, session)
+        if prepared.cached is not None:
+            return prepared.cached
 
+        client = self._get_client()
         try:
             response = client.chat.completions.create(
-                model=groq_model,
-                messages=messages,
-                temperature=temperature,
+                model=prepared.model,
+                messages=prepared.messages,
+                temperature=prepared.temperature,
                 max_tokens=600,
             )
         except Exception as exc:
-            error_message = str(exc).lower()
-            if "rate limit" in error_message or "rate_limit" in error_message:
-                raise RateLimitExceededError(
-                    "Groq rate limit reached. Please try again shortly."
-                ) from exc
-            raise RuntimeError(
-                "The UMUHUZA assistant is temporarily unavailable."
-            ) from exc
+            raise self._completion_error(exc) from exc
 
         choice  = response.choices[0]
-        content = choice.message.content or ""
-        return content.strip() or "Sorry, I could not generate a response this time."
+        content = (choice.message.content or "").strip()
+        if not content:
+            return "Sorry, I could not generate a response this time."
+        self._remember(prepared, content)
+        return content
+
+    def generate_stream(
+        self,
+        user_message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        session=None,
+    ) -> Iterator[str]:
+        """Return an iterator of text deltas.
+
+        Retrieval, the cache lookup and the upstream request all happen before
+        this returns, so configuration and rate-limit errors are raised here
+        rather than halfway through a streamed response.
+        """
+        prepared = self._prepare(user_message, history, session)
+        if prepared.cached is not None:
+            return iter([prepared.cached])
+
+        client = self._get_client()
+        try:
+            stream = client.chat.completions.create(
+                model=prepared.model,
+                messages=prepared.messages,
+                temperature=prepared.temperature,
+                max_tokens=600,
+                stream=True,
+            )
+        except Exception as exc:
+            raise self._completion_error(exc) from exc
+        return self._iter_deltas(stream, prepared)
+
+    def _iter_deltas(self, stream, prepared: _PreparedChat) -> Iterator[str]:
+        parts: List[str] = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as exc:
+            raise self._completion_error(exc) from exc
+
+        content = "".join(parts).strip()
+        if content:
+            self._remember(prepared, content)
+        else:
+            yield "Sorry, I could not generate a response this time."
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for monitoring (exposed by the /chat/stats route)."""
+        return {
+            "retrieval_mode":  self.retrieval_mode,
+            "knowledge_index": {
+                "chunks":  knowledge_index.size,
+                "reloads": knowledge_index.reloads,
+                "source":  knowledge_index.loaded_from,
+            },
+            "answer_cache":    self.answer_cache.stats(),
+            "semantic_cache":  self.semantic_cache.stats(),
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -263,4 +401,13 @@ def generate_response_with_session(
     session,
 ) -> str:
     """Preferred helper when a SQLAlchemy session is available."""
-    return assistant.generate(user_message, history, session=session)
\ No newline at end of file
+    return assistant.generate(user_message, history, session=session)
+
+
+def stream_response_with_session(
+    user_message: str,
+    history: Optional[List[Dict[str, str]]],
+    session,
+) -> Iterator[str]:
+    """Streaming counterpart of generate_response_with_session (text deltas)."""
+    return assistant.generate_stream(user_message, history, session=session)
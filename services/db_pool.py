@@ -0,0 +1,128 @@
+"""
+services/db_pool.py
+Connection-pool settings for the SQLAlchemy engine, plus live pool counters.
+DB_POOL_MODE picks the strategy:
+  queue  - small QueuePool with pre-ping and recycle (default); warm workers and
+           warm serverless instances reuse TLS connections instead of reconnecting
+  null   - NullPool: a fresh connection per checkout (the old Vercel behaviour)
+  proxy  - NullPool towards an external pooler (ProxySQL, RDS Proxy, PgBouncer),
+           optionally at DB_PROXY_URL, which does the pooling instead
+Place this file at:  services/db_pool.py
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+
+POOL_MODES        = ("queue", "null", "proxy")
+DEFAULT_POOL_MODE = "queue"
+
+# Long-lived workers vs. serverless instances (one request at a time, frozen when idle)
+SERVER_POOL_DEFAULTS     = {"size": 5, "max_overflow": 5, "recycle": 280, "timeout": 10}
+SERVERLESS_POOL_DEFAULTS = {"size": 1, "max_overflow": 1, "recycle": 60,  "timeout": 10}
+
+
+def is_serverless() -> bool:
+    return bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
+
+def get_pool_mode_from_env() -> str:
+    raw = (os.getenv("DB_POOL_MODE") or "").strip().lower()
+    return raw if raw in POOL_MODES else DEFAULT_POOL_MODE
+
+
+def _int_from_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def pool_options_from_env(mode: Optional[str] = None) -> Dict[str, object]:
+    """SQLALCHEMY_ENGINE_OPTIONS entries (without connect_args) for the pool mode."""
+    mode = mode or get_pool_mode_from_env()
+    if mode in ("null", "proxy"):
+        return {"poolclass": NullPool}
+
+    defaults = SERVERLESS_POOL_DEFAULTS if is_serverless() else SERVER_POOL_DEFAULTS
+    return {
+        "poolclass":     QueuePool,
+        "pool_size":     max(1, _int_from_env("DB_POOL_SIZE", defaults["size"])),
+        "max_overflow":  _int_from_env("DB_POOL_MAX_OVERFLOW", defaults["max_overflow"]),
+        "pool_recycle":  _int_from_env("DB_POOL_RECYCLE", defaults["recycle"]),
+        "pool_timeout":  _int_from_env("DB_POOL_TIMEOUT", defaults["timeout"]),
+        "pool_pre_ping": True,
+    }
+
+
+def proxy_url_from_env() -> Optional[str]:
+    """DB_PROXY_URL, used instead of DATABASE_URL when DB_POOL_MODE=proxy."""
+    if get_pool_mode_from_env() != "proxy":
+        return None
+    return os.getenv("DB_PROXY_URL") or None
+
+
+class PoolStats:
+    """Counts pool events on an engine (attach once per engine)."""
+
+    def __init__(self) -> None:
+        self._lock          = threading.Lock()
+        self.connects       = 0   # new physical DB connections (TLS handshakes)
+        self.checkouts      = 0
+        self.checkins       = 0
+        self.invalidations  = 0   # dropped by pre-ping / errors
+        self.checkout_ms    = 0.0
+        self._started: Dict[int, float] = {}
+
+    def attach(self, engine) -> "PoolStats":
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        return self
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._started[id(connection_record)] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+            started = self._started.pop(id(connection_record), None)
+            if started is not None:
+                self.checkout_ms += (time.perf_counter() - started) * 1000
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, engine) -> Dict[str, object]:
+        pool  = engine.pool
+        stats = {
+            "mode":            get_pool_mode_from_env(),
+            "pool_class":      type(pool).__name__,
+            "connects":        self.connects,
+            "checkouts":       self.checkouts,
+            "checkins":        self.checkins,
+            "invalidations":   self.invalidations,
+            "reuse_rate":      round(1 - self.connects / self.checkouts, 4) if self.checkouts else 0.0,
+            "avg_held_ms":     round(self.checkout_ms / self.checkins, 2) if self.checkins else 0.0,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size":        pool.size(),
+                "checked_in":  pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow":    max(0, pool.overflow()),
+            })
+        return stats
@@ -1,32 +1,89 @@
+import functools
 import hashlib
+import json
 import os
 import re
-from typing import Sequence
+import struct
+import zlib
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
 
 import numpy as np
 
 DEFAULT_EMBED_DIM = 4096
 TOKEN_PATTERN = re.compile(r"\b\w+\b", re.UNICODE)
 
+# "sha256" reproduces the vectors already stored in knowledge_base; "fast"
+# uses a stable 32-bit CRC and needs a reseed to stay consistent.
+HASH_MODES = ("sha256", "fast")
+DEFAULT_HASH_MODE = "sha256"
+TOKEN_CACHE_SIZE = 65536
 
-def _tokenize(text: str) -> Sequence[str]:
+EMBED_FORMATS = ("sparse", "dense", "binary32", "binary16", "binary-sparse")
+DEFAULT_EMBED_FORMAT = "sparse"
+
+# Binary column layout: 16-byte header followed by little-endian payload.
+#   magic "IKEB" | version u8 | kind u8 | 2 pad bytes | dim u32 | count u32
+# Dense kinds store `dim` float16/float32 values; the sparse kind stores
+# `count` uint32 indices followed by `count` float32 weights.
+BINARY_MAGIC = b"IKEB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sBBxxII")
+BINARY_KIND_FLOAT16 = 1
+BINARY_KIND_FLOAT32 = 2
+BINARY_KIND_SPARSE = 3
+_BINARY_DTYPES = {
+    BINARY_KIND_FLOAT16: np.dtype("<f2"),
+    BINARY_KIND_FLOAT32: np.dtype("<f4"),
+}
+
+
+class SparseVector(NamedTuple):
+    """L2-normalised hashed embedding stored as sorted index/weight pairs."""
+
+    dim: int
+    indices: np.ndarray  # int32, sorted and unique
+    weights: np.ndarray  # float32, same length as indices
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indices.shape[0])
+
+
+def tokenize(text: str) -> Sequence[str]:
     if not text:
         return []
     return TOKEN_PATTERN.findall(text.lower())
 
 
-def hash_embed(text: str, dim: int | None = None) -> np.ndarray:
+def _fast_hash32(data: bytes) -> int:
+    """
+    Stable 32-bit non-cryptographic hash (seeded CRC32). Plenty for picking one
+    of a few thousand buckets; for power-of-two dims it gives the same buckets
+    as the earlier two-CRC version, whose high half never reached the modulo.
+    """
+    return zlib.crc32(data, 0x9E3779B9)
+
+
+@functools.lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_bucket(token: str, size: int, mode: str = DEFAULT_HASH_MODE) -> int:
+    data = token.encode("utf-8")
+    if mode == "fast":
+        return _fast_hash32(data) % size
+    # Same bucket as int(sha256(token).hexdigest(), 16) % size, without the hex round trip
+    return int.from_bytes(hashlib.sha256(data).digest(), "big") % size
+
+
+def _token_buckets(text: str, size: int, mode: str) -> np.ndarray:
+    return np.fromiter(
+        (_token_bucket(token, size, mode) for token in tokenize(text)), dtype=np.int64
+    )
+
+
+def hash_embed(text: str, dim: int | None = None, mode: str | None = None) -> np.ndarray:
     """Convert text to a normalized hashed embedding vector."""
     size = dim or DEFAULT_EMBED_DIM
-    vector = np.zeros(size, dtype=np.float32)
-    tokens = _tokenize(text)
-    if not tokens:
-        return vector
-
-    for token in tokens:
-        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
-        index = int(digest, 16) % size
-        vector[index] += 1.0
+    buckets = _token_buckets(text, size, mode or get_hash_mode_from_env())
+    vector = np.bincount(buckets, minlength=size).astype(np.float32)
 
     norm = np.linalg.norm(vector)
     if norm > 0:
@@ -34,6 +91,202 @@ def hash_embed(text: str, dim: int | None = None) -> np.ndarray:
     return vector
 
 
+def hash_embed_many(
+    texts: Iterable[str], dim: int | None = None, mode: str | None = None
+) -> np.ndarray:
+    """Embed a batch of texts into an (n, dim) matrix of normalized rows."""
+    size = dim or DEFAULT_EMBED_DIM
+    hash_mode = mode or get_hash_mode_from_env()
+    per_text = [_token_buckets(text, size, hash_mode) for text in texts]
+
+    matrix = np.zeros((len(per_text), size), dtype=np.float32)
+    if per_text:
+        rows = np.repeat(np.arange(len(per_text)), [b.shape[0] for b in per_text])
+        cols = np.concatenate(per_text)
+        np.add.at(matrix, (rows, cols), 1.0)
+
+    norms = np.linalg.norm(matrix, axis=1)
+    nonzero = norms > 0
+    matrix[nonzero] /= norms[nonzero, None]
+    return matrix
+
+
+def hash_embed_sparse(
+    text: str, dim: int | None = None, mode: str | None = None
+) -> SparseVector:
+    """Same embedding as hash_embed, but only the non-zero buckets are kept."""
+    size = dim or DEFAULT_EMBED_DIM
+    buckets = _token_buckets(text, size, mode or get_hash_mode_from_env())
+    indices, counts = np.unique(buckets, return_counts=True)
+    weights = counts.astype(np.float32)
+    norm = np.linalg.norm(weights)
+    if norm > 0:
+        weights /= norm
+    return SparseVector(size, indices.astype(np.int32), weights)
+
+
+def dense_to_sparse(vector: Sequence[float]) -> SparseVector:
+    dense = np.asarray(vector, dtype=np.float32)
+    indices = np.flatnonzero(dense).astype(np.int32)
+    return SparseVector(int(dense.shape[0]), indices, dense[indices].copy())
+
+
+def sparse_to_dense(vector: SparseVector) -> np.ndarray:
+    dense = np.zeros(vector.dim, dtype=np.float32)
+    dense[vector.indices] = vector.weights
+    return dense
+
+
+def serialize_sparse(vector: SparseVector) -> str:
+    """Compact JSON form: {"dim": 4096, "i": [...], "w": [...]}."""
+    return json.dumps(
+        {
+            "dim": vector.dim,
+            "i": vector.indices.tolist(),
+            "w": [round(float(w), 6) for w in vector.weights],
+        },
+        separators=(",", ":"),
+    )
+
+
+def deserialize_sparse(payload: Union[str, dict]) -> SparseVector:
+    data = json.loads(payload) if isinstance(payload, str) else payload
+    indices = np.asarray(data["i"], dtype=np.int32)
+    weights = np.asarray(data["w"], dtype=np.float32)
+    if indices.shape != weights.shape:
+        raise ValueError("Sparse embedding has mismatched index/weight lengths.")
+    order = np.argsort(indices, kind="stable")
+    return SparseVector(int(data["dim"]), indices[order], weights[order])
+
+
+def encode_embedding_binary(
+    vector: Union[Sequence[float], SparseVector], dtype: str = "float32"
+) -> bytes:
+    """Serialise a dense vector (float16/float32) or a SparseVector to the binary layout."""
+    if isinstance(vector, SparseVector):
+        header = BINARY_HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, BINARY_KIND_SPARSE, vector.dim, vector.nnz
+        )
+        return (
+            header
+            + vector.indices.astype("<u4").tobytes()
+            + vector.weights.astype("<f4").tobytes()
+        )
+
+    kind = BINARY_KIND_FLOAT16 if dtype == "float16" else BINARY_KIND_FLOAT32
+    dense = np.asarray(vector, dtype=_BINARY_DTYPES[kind])
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, kind, dense.shape[0], dense.shape[0]
+    )
+    return header + dense.tobytes()
+
+
+def is_binary_embedding(payload) -> bool:
+    return (
+        isinstance(payload, (bytes, bytearray, memoryview))
+        and bytes(payload[:4]) == BINARY_MAGIC
+    )
+
+
+def decode_embedding_binary(payload) -> Union[np.ndarray, SparseVector]:
+    """Zero-copy decode: the returned arrays are read-only views over `payload`."""
+    buffer = memoryview(payload)
+    if buffer.nbytes < BINARY_HEADER.size:
+        raise ValueError("Binary embedding is shorter than its header.")
+    magic, version, kind, dim, count = BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary knowledge_base embedding.")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary embedding version {version}.")
+
+    offset = BINARY_HEADER.size
+    if kind == BINARY_KIND_SPARSE:
+        indices = np.frombuffer(buffer, dtype="<u4", count=count, offset=offset)
+        weights = np.frombuffer(buffer, dtype="<f4", count=count, offset=offset + 4 * count)
+        if count and int(indices.max()) >= dim:
+            raise ValueError("Sparse binary embedding has an index outside its dimension.")
+        return SparseVector(dim, indices, weights)
+    if kind in _BINARY_DTYPES:
+        return np.frombuffer(buffer, dtype=_BINARY_DTYPES[kind], count=dim, offset=offset)
+    raise ValueError(f"Unknown binary embedding kind {kind}.")
+
+
+def _encode_row(dense: np.ndarray, fmt: str) -> Union[str, bytes]:
+    if fmt == "dense":
+        return json.dumps(np.asarray(dense, dtype=float).tolist())
+    if fmt == "binary32":
+        return encode_embedding_binary(dense, "float32")
+    if fmt == "binary16":
+        return encode_embedding_binary(dense, "float16")
+    if fmt == "binary-sparse":
+        return encode_embedding_binary(dense_to_sparse(dense))
+    return serialize_sparse(dense_to_sparse(dense))
+
+
+def encode_embedding(
+    text: str, dim: int, fmt: str, mode: str | None = None
+) -> Union[str, bytes]:
+    """Embed text and serialise it for the knowledge_base.embedding column."""
+    return _encode_row(hash_embed(text, dim, mode), fmt)
+
+
+def encode_embeddings(
+    texts: Sequence[str], dim: int, fmt: str, mode: str | None = None
+) -> list:
+    """Batch version of encode_embedding built on hash_embed_many."""
+    return [_encode_row(row, fmt) for row in hash_embed_many(texts, dim, mode)]
+
+
+def decode_embedding(payload) -> Optional[Union[np.ndarray, SparseVector]]:
+    """Decode a stored knowledge_base embedding (binary, dense JSON list or sparse JSON object)."""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        if is_binary_embedding(payload):
+            try:
+                return decode_embedding_binary(payload)
+            except ValueError:
+                return None
+        try:
+            payload = bytes(payload).decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except (json.JSONDecodeError, ValueError):
+            return None
+    if isinstance(payload, dict):
+        try:
+            return deserialize_sparse(payload)
+        except (KeyError, TypeError, ValueError):
+            return None
+    if not payload:
+        return None
+    vector = np.asarray(payload, dtype=np.float32)
+    return vector if vector.ndim == 1 and vector.size else None
+
+
+def sparse_cosine(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity touching only the shared non-zero buckets."""
+    if a.dim != b.dim or not a.nnz or not b.nnz:
+        return 0.0
+    _, ia, ib = np.intersect1d(a.indices, b.indices, assume_unique=True, return_indices=True)
+    denominator = float(np.linalg.norm(a.weights) * np.linalg.norm(b.weights))
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(a.weights[ia], b.weights[ib]) / denominator)
+
+
+def sparse_dense_cosine(a: SparseVector, dense: Sequence[float]) -> float:
+    """Cosine similarity of a sparse vector against a dense one."""
+    vector = np.asarray(dense, dtype=np.float32)
+    if vector.shape[0] != a.dim or not a.nnz:
+        return 0.0
+    denominator = float(np.linalg.norm(a.weights) * np.linalg.norm(vector))
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(vector[a.indices], a.weights) / denominator)
+
+
 def get_embed_dim_from_env() -> int:
     """Read embedding dimension from environment (used by services/scripts)."""
     raw = os.getenv("KNOWLEDGE_EMBED_DIM")
@@ -46,3 +299,14 @@ def get_embed_dim_from_env() -> int:
             pass
     return DEFAULT_EMBED_DIM
 
+
+def get_embed_format_from_env() -> str:
+    """Read the storage format for new knowledge_base rows (see EMBED_FORMATS)."""
+    raw = (os.getenv("KNOWLEDGE_EMBED_FORMAT") or "").strip().lower()
+    return raw if raw in EMBED_FORMATS else DEFAULT_EMBED_FORMAT
+
+
+def get_hash_mode_from_env() -> str:
+    """Read the token hashing mode (sha256 or fast); must match the seeded rows."""
+    raw = (os.getenv("KNOWLEDGE_HASH_MODE") or "").strip().lower()
+    return raw if raw in HASH_MODES else DEFAULT_HASH_MODE
@@ -0,0 +1,388 @@
+"""
+services/export_jobs.py
+Background export jobs for the policy user lists (Excel / PDF).
+A job is submitted from the request, runs on a small process-wide worker pool
+inside its own Flask app context and writes its file under EXPORT_JOB_DIR;
+the client polls the status endpoint and downloads the file when it is ready.
+Job state lives in a JSON file next to the output, so any worker on the same
+host can answer a poll. Each job records the host and pid running it and a
+heartbeat; a queued/running job whose process has died or whose heartbeat has
+gone quiet is reported as failed instead of spinning forever. With no pool
+(serverless) the job runs inline and the caller streams the file in the same
+response, since the next request may land on another instance's /tmp.
+Rows are streamed from the caller's iterator:
+Excel uses openpyxl's write-only workbook and PDF is built from page-sized
+ReportLab tables instead of one giant Table.
+Env:
+  EXPORT_JOB_WORKERS      - pool size (2 on servers, 0 = run inline on serverless)
+  EXPORT_JOB_DIR          - where job files are kept (default /tmp/umuhuza_exports)
+  EXPORT_JOB_TTL_SECONDS  - finished jobs are deleted after this long (default 3600)
+  EXPORT_JOB_STALE_SECONDS - a job with no heartbeat for this long has failed (default 600)
+Place this file at:  services/export_jobs.py
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from services.db_pool import is_serverless
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Safe imports of the file writers
+# ---------------------------------------------------------------------------
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    _OPENPYXL_AVAILABLE = True
+except ModuleNotFoundError:
+    _OPENPYXL_AVAILABLE = False
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+    _REPORTLAB_AVAILABLE = True
+except ModuleNotFoundError:
+    _REPORTLAB_AVAILABLE = False
+
+
+DEFAULT_EXPORT_DIR   = "/tmp/umuhuza_exports"
+DEFAULT_JOB_TTL      = 3600
+DEFAULT_STALE_AFTER  = 600
+HEARTBEAT_INTERVAL   = 10     # seconds between heartbeat writes while rows stream
+SERVER_WORKERS       = 2
+PDF_ROWS_PER_TABLE   = 40     # about one A4 page at 10pt with padding
+EXPORT_FORMATS       = {
+    "excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "pdf":   ("pdf",  "application/pdf"),
+}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+STALE_ERROR = "The export worker stopped before finishing; please try again."
+
+
+def get_export_dir_from_env() -> str:
+    return os.getenv("EXPORT_JOB_DIR") or DEFAULT_EXPORT_DIR
+
+
+def get_job_ttl_from_env() -> float:
+    try:
+        value = float(os.getenv("EXPORT_JOB_TTL_SECONDS", DEFAULT_JOB_TTL))
+    except ValueError:
+        return DEFAULT_JOB_TTL
+    return value if value > 0 else DEFAULT_JOB_TTL
+
+
+def get_stale_after_from_env() -> float:
+    try:
+        value = float(os.getenv("EXPORT_JOB_STALE_SECONDS", DEFAULT_STALE_AFTER))
+    except ValueError:
+        return DEFAULT_STALE_AFTER
+    return value if value > 0 else DEFAULT_STALE_AFTER
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True    # exists, owned by someone else
+    except OSError:
+        return False
+    return True
+
+
+def get_worker_count_from_env() -> int:
+    """EXPORT_JOB_WORKERS — 0 runs jobs inline (serverless: no work after the response)."""
+    default = 0 if is_serverless() else SERVER_WORKERS
+    try:
+        value = int(os.getenv("EXPORT_JOB_WORKERS", default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+def write_xlsx(path: str, title: str, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """Stream rows into a write-only workbook; only the current row is held in memory."""
+    if not _OPENPYXL_AVAILABLE:
+        raise RuntimeError("openpyxl is required for Excel exports.")
+    workbook = Workbook(write_only=True)
+    sheet    = workbook.create_sheet(title=title[:31])
+    bold     = Font(bold=True)
+    cells    = []
+    for name in header:
+        cell      = WriteOnlyCell(sheet, value=name)
+        cell.font = bold
+        cells.append(cell)
+    sheet.append(cells)
+    count = 0
+    for row in rows:
+        sheet.append(list(row))
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def _pdf_table(header: Sequence[str], chunk: List[List[str]]) -> "Table":
+    table = Table([list(header)] + chunk, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#263238")),
+        ("TEXTCOLOR",  (0, 0), (-1, 0), colors.white),
+        ("ALIGN",      (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME",   (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE",   (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+        ("GRID",       (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    return table
+
+
+def write_pdf(path: str, title: str, header: Sequence[str], rows: Iterable[Sequence[Any]],
+              rows_per_table: int = PDF_ROWS_PER_TABLE) -> int:
+    """
+    One small Table per page-sized chunk of rows. ReportLab lays out and splits a
+    Table as a whole, so one Table with every row costs far more time and memory
+    than many tables that each fit on a page.
+    """
+    if not _REPORTLAB_AVAILABLE:
+        raise RuntimeError("ReportLab is required for PDF exports.")
+    styles   = getSampleStyleSheet()
+    elements = [Paragraph(title, styles["Title"])]
+    chunk: List[List[str]] = []
+    count = 0
+    for row in rows:
+        chunk.append(["-" if value is None else str(value) for value in row])
+        count += 1
+        if len(chunk) >= rows_per_table:
+            elements.append(_pdf_table(header, chunk))
+            chunk = []
+    if chunk or count == 0:
+        elements.append(_pdf_table(header, chunk))
+    SimpleDocTemplate(path, pagesize=A4, title=title).build(elements)
+    return count
+
+
+WRITERS: Dict[str, Callable[..., int]] = {"excel": write_xlsx, "pdf": write_pdf}
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+class ExportJobManager:
+    """
+    Submit, track and clean up export jobs.
+
+        job = export_jobs.submit(app, owner_id=current_user.id, filetype="excel",
+                                 title="Farmer Users", filename="farmer_users.xlsx",
+                                 header=["ID", "Full Name"], rows=lambda: iter_rows())
+
+    `rows` is called inside the job's app context and must not touch `request`
+    or `current_user`. When `inline` is true the job has finished by the time
+    `submit` returns and the caller should send the file straight away.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None,
+                 workers: Optional[int] = None, stale_after: Optional[float] = None) -> None:
+        self.directory   = directory or get_export_dir_from_env()
+        self.ttl         = ttl or get_job_ttl_from_env()
+        self.workers     = get_worker_count_from_env() if workers is None else workers
+        self.stale_after = stale_after or get_stale_after_from_env()
+        self.host        = socket.gethostname()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock     = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    def _meta_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def file_path(self, job: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, f"{job['id']}.{EXPORT_FORMATS[job['filetype']][0]}")
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        tmp = self._meta_path(job["id"]) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump(job, handle)
+        os.replace(tmp, self._meta_path(job["id"]))
+
+    @property
+    def inline(self) -> bool:
+        return self.workers == 0
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # Job ids are uuid4 hex; anything else never reaches the filesystem
+        if not job_id or len(job_id) != 32 or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(self._meta_path(job_id), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def is_stale(self, job: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Queued/running, but its process on this host is gone or its heartbeat went quiet."""
+        if job["status"] not in (QUEUED, RUNNING):
+            return False
+        if job.get("host") == self.host and job.get("pid") and not _pid_alive(job["pid"]):
+            return True
+        heartbeat = job.get("heartbeat") or job["created_at"]
+        return (now or time.time()) - heartbeat > self.stale_after
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job, with a stale queued/running job recorded as failed."""
+        job = self._load(job_id)
+        if job is not None and self.is_stale(job):
+            logger.warning("Export %s was %s in pid %s on %s and went stale; marking it failed",
+                           job["id"], job["status"], job.get("pid"), job.get("host"))
+            self._update(job, status=FAILED, error=STALE_ERROR, finished_at=time.time())
+        return job
+
+    def _update(self, job: Dict[str, Any], **changes: Any) -> Dict[str, Any]:
+        job.update(changes)
+        self._save(job)
+        return job
+
+    def discard(self, job: Dict[str, Any]) -> None:
+        """Delete a job and its file now (an inline export, once the caller holds the file open)."""
+        for path in (self.file_path(job), self._meta_path(job["id"])):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Delete jobs (and their files) older than the TTL; returns how many went."""
+        now     = now or time.time()
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                    removed += name.endswith(".json")
+            except OSError:
+                pass
+        return removed
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        if self.workers == 0:
+            return None
+        with self._lock:
+            # A forked gunicorn worker gets its own pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export-job")
+                self._pid      = os.getpid()
+            return self._executor
+
+    def _find_active(self, owner_id: Any, filetype: str, title: str) -> Optional[Dict[str, Any]]:
+        """A live queued/running job for the same export, so repeat clicks don't pile up work."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return None
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            job = self.get(name[:-5])
+            if (job and job["status"] in (QUEUED, RUNNING) and job["owner_id"] == owner_id
+                    and job["filetype"] == filetype and job["title"] == title):
+                return job
+        return None
+
+    def submit(self, app, owner_id: Any, filetype: str, title: str, filename: str,
+               header: Sequence[str], rows: Callable[[], Iterable[Sequence[Any]]]) -> Dict[str, Any]:
+        if filetype not in WRITERS:
+            raise ValueError(f"Unsupported export format: {filetype}")
+        os.makedirs(self.directory, exist_ok=True)
+        self.cleanup()
+        with self._lock:
+            # Inline jobs finish inside their own request, so there is nothing to share
+            active = None if self.inline else self._find_active(owner_id, filetype, title)
+            if active:
+                return active
+            now = time.time()
+            job = {
+                "id":          uuid.uuid4().hex,
+                "owner_id":    owner_id,
+                "filetype":    filetype,
+                "title":       title,
+                "filename":    filename,
+                "status":      QUEUED,
+                "rows":        None,
+                "error":       None,
+                "created_at":  now,
+                "finished_at": None,
+                "host":        self.host,
+                "pid":         os.getpid(),
+                "heartbeat":   now,
+            }
+            self._save(job)
+
+        executor = self._get_executor()
+        if executor is None:
+            self._run(app, job, header, rows)
+        else:
+            executor.submit(self._run, app, job, header, rows)
+        return job
+
+    def _beating(self, job: Dict[str, Any], rows: Iterable[Sequence[Any]]) -> Iterable[Sequence[Any]]:
+        """Pass rows through, refreshing the job's heartbeat every HEARTBEAT_INTERVAL seconds."""
+        last = time.time()
+        for row in rows:
+            yield row
+            now = time.time()
+            if now - last >= HEARTBEAT_INTERVAL:
+                self._update(job, heartbeat=now)
+                last = now
+
+    def _run(self, app, job: Dict[str, Any], header: Sequence[str],
+             rows: Callable[[], Iterable[Sequence[Any]]]) -> None:
+        current = self.get(job["id"])
+        if current is None or current["status"] != QUEUED:
+            # Expired or already given up on as stale while it waited in the queue
+            return
+        started = time.perf_counter()
+        path    = self.file_path(job)
+        part    = path + ".part"
+        self._update(job, status=RUNNING, pid=os.getpid(), heartbeat=time.time())
+        try:
+            with app.app_context():
+                count = WRITERS[job["filetype"]](part, job["title"], header, self._beating(job, rows()))
+            os.replace(part, path)
+            self._update(job, status=DONE, rows=count, finished_at=time.time())
+            logger.info("Export %s (%s, %d rows) took %.2fs", job["id"], job["filetype"],
+                        count, time.perf_counter() - started)
+        except Exception as exc:
+            logger.exception("Export %s failed", job["id"])
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            self._update(job, status=FAILED, error=str(exc), finished_at=time.time())
+
+
+export_jobs = ExportJobManager()
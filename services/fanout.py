@@ -0,0 +1,135 @@
+"""
+services/fanout.py
+Request-scoped concurrent loader for independent dashboard sections.
+Each request gets its own small thread pool and every section runs inside its
+own Flask app context, so Flask-SQLAlchemy hands it a separate session (and
+pooled connection) that is removed when the section finishes. Every section
+has a timeout and a default: a slow weather fetch or one heavy table degrades
+that section only instead of serializing the whole page, and because pools
+are per request, one user's slow sections never queue another user's.
+Place this file at:  services/fanout.py
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from services.db_pool import is_serverless
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTION_TIMEOUT = 5.0
+# Serverless instances get a 1+1 connection pool, so more workers would just queue
+SERVER_WORKERS          = 8
+SERVERLESS_WORKERS      = 2
+
+
+def _float_from_env(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def get_section_timeout_from_env() -> float:
+    """DASHBOARD_SECTION_TIMEOUT_SECONDS — per-section budget for dashboard loads."""
+    return _float_from_env("DASHBOARD_SECTION_TIMEOUT_SECONDS", DEFAULT_SECTION_TIMEOUT)
+
+
+def get_worker_count_from_env() -> int:
+    """DASHBOARD_FANOUT_WORKERS — concurrent sections per request (0 runs sections inline)."""
+    default = SERVERLESS_WORKERS if is_serverless() else SERVER_WORKERS
+    try:
+        value = int(os.getenv("DASHBOARD_FANOUT_WORKERS", default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+class SectionLoader:
+    """
+    Collects named sections for one request and runs them concurrently.
+
+        loader = SectionLoader(app)
+        loader.add("crops", load_crops, default=([], None), reraise=(InvalidCursor,))
+        loader.add("weather", weather_service.get_weather, default=fallback, timeout=3)
+        data = loader.run()     # {"crops": ..., "weather": ...}
+
+    Section callables must not touch `request` / `current_user`; pass the values
+    they need in from the view. Exceptions listed in `reraise` propagate out of
+    run(); anything else (and a timeout) logs and yields the section default.
+    """
+
+    def __init__(self, app, timeout: Optional[float] = None) -> None:
+        self.app      = app
+        self.timeout  = get_section_timeout_from_env() if timeout is None else timeout
+        self._sections: Dict[str, Tuple[Callable[[], Any], Any, float, Tuple[Type[BaseException], ...]]] = {}
+        self.timings: Dict[str, Optional[float]] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        default: Any = None,
+        timeout: Optional[float] = None,
+        reraise: Tuple[Type[BaseException], ...] = (),
+    ) -> "SectionLoader":
+        self._sections[name] = (func, default, self.timeout if timeout is None else timeout, reraise)
+        return self
+
+    def _call(self, name: str, func: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                return func()
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _fallback(self, name: str, default: Any, exc: BaseException,
+                  reraise: Tuple[Type[BaseException], ...]) -> Any:
+        if reraise and isinstance(exc, reraise):
+            raise exc
+        logger.warning("Dashboard section %r failed: %s", name, exc)
+        return default
+
+    def run(self) -> Dict[str, Any]:
+        workers = min(get_worker_count_from_env(), len(self._sections))
+        results: Dict[str, Any] = {}
+
+        if workers == 0:
+            for name, (func, default, _, reraise) in self._sections.items():
+                try:
+                    results[name] = self._call(name, func)
+                except Exception as exc:
+                    results[name] = self._fallback(name, default, exc, reraise)
+            return results
+
+        # Request-scoped pool: queued sections only ever wait on this request's own work
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard-section")
+        try:
+            return self._collect(executor, results)
+        finally:
+            # Timed-out sections finish in the background and release their sessions
+            executor.shutdown(wait=False)
+
+    def _collect(self, executor: ThreadPoolExecutor, results: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.monotonic()
+        futures = {name: executor.submit(self._call, name, func)
+                   for name, (func, _, _, _) in self._sections.items()}
+        for name, future in futures.items():
+            _, default, timeout, reraise = self._sections[name]
+            remaining = max(0.0, started + timeout - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeout:
+                # The worker keeps running and releases its session when done
+                future.cancel()
+                self.timings.setdefault(name, None)
+                logger.warning("Dashboard section %r timed out after %.1fs", name, timeout)
+                results[name] = default
+            except Exception as exc:
+                results[name] = self._fallback(name, default, exc, reraise)
+        return results
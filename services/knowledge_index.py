@@ -0,0 +1,427 @@
+"""
+services/knowledge_index.py
+Process-wide in-memory vector index over the knowledge_base table.
+Every chunk is loaded once into a contiguous, pre-normalised float32 matrix so
+a chat question costs one matrix-vector product instead of a full-table scan.
+The same chunks also feed a BM25 inverted index for lexical / hybrid retrieval.
+When a prebuilt artifact (scripts/seed_knowledge_base.py --build-artifact) is
+shipped with the deployment, the matrix is memory-mapped from disk and RAG
+needs no database round trip; the knowledge_base table stays the fallback.
+Place this file at:  services/knowledge_index.py
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# ---------------------------------------------------------------------------
+# Safe import of numpy (the whole index is a numpy matrix)
+# ---------------------------------------------------------------------------
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except ModuleNotFoundError:
+    np = None  # type: ignore
+    _NUMPY_AVAILABLE = False
+
+# ---------------------------------------------------------------------------
+# Safe import of SQLAlchemy text() (only needed when loading from the DB)
+# ---------------------------------------------------------------------------
+try:
+    from sqlalchemy import inspect, text
+    _SQLALCHEMY_AVAILABLE = True
+except ModuleNotFoundError:
+    inspect = None  # type: ignore
+    text = None  # type: ignore
+    _SQLALCHEMY_AVAILABLE = False
+
+# ---------------------------------------------------------------------------
+# Safe import of the embedding codecs and the BM25 retriever
+# ---------------------------------------------------------------------------
+try:
+    from services.embeddings import (
+        SparseVector,
+        decode_embedding,
+        get_hash_mode_from_env,
+        hash_embed_many,
+    )
+    from services.lexical import BM25Index
+    _EMBEDDINGS_AVAILABLE = True
+except (ModuleNotFoundError, ImportError):
+    SparseVector = None  # type: ignore
+    decode_embedding = None  # type: ignore
+    get_hash_mode_from_env = None  # type: ignore
+    hash_embed_many = None  # type: ignore
+    BM25Index = None  # type: ignore
+    _EMBEDDINGS_AVAILABLE = False
+
+
+# How often (seconds) to ask the DB whether knowledge_base changed
+DEFAULT_VERSION_CHECK_SECONDS = 30.0
+
+
+def get_version_check_seconds_from_env() -> float:
+    """Read KNOWLEDGE_INDEX_CHECK_SECONDS (0 = check on every query)."""
+    raw = os.getenv("KNOWLEDGE_INDEX_CHECK_SECONDS")
+    if raw:
+        try:
+            value = float(raw)
+            if value >= 0:
+                return value
+        except ValueError:
+            pass
+    return DEFAULT_VERSION_CHECK_SECONDS
+
+
+# Where retrieval loads chunks from: artifact first then DB, or only one of them
+KNOWLEDGE_SOURCES      = ("auto", "artifact", "db")
+DEFAULT_SOURCE         = "auto"
+ROOT_DIR               = Path(__file__).resolve().parents[1]
+KNOWLEDGE_FILE         = ROOT_DIR / "chatbot_knowledge_base.json"
+DEFAULT_ARTIFACT_DIR   = ROOT_DIR / "artifacts"
+ARTIFACT_MATRIX_FILE   = "knowledge_embeddings.npy"
+ARTIFACT_MANIFEST_FILE = "knowledge_chunks.json"
+
+
+def get_source_from_env() -> str:
+    """Read KNOWLEDGE_SOURCE (auto, artifact or db)."""
+    raw = (os.getenv("KNOWLEDGE_SOURCE") or "").strip().lower()
+    return raw if raw in KNOWLEDGE_SOURCES else DEFAULT_SOURCE
+
+
+def get_artifact_dir_from_env() -> Path:
+    """Read KNOWLEDGE_ARTIFACT_DIR (default: <project>/artifacts)."""
+    raw = os.getenv("KNOWLEDGE_ARTIFACT_DIR")
+    return Path(raw) if raw else DEFAULT_ARTIFACT_DIR
+
+
+def _file_sha256(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def write_artifact(
+    chunks: Sequence[str],
+    dim: int,
+    directory: Optional[Path] = None,
+    mode: Optional[str] = None,
+) -> Path:
+    """Embed `chunks` and save the normalised matrix (.npy) plus a JSON manifest."""
+    directory = Path(directory or get_artifact_dir_from_env())
+    directory.mkdir(parents=True, exist_ok=True)
+    hash_mode = mode or get_hash_mode_from_env()
+
+    matrix = hash_embed_many(chunks, dim, hash_mode)
+    keep   = np.linalg.norm(matrix, axis=1) > 0
+    np.save(directory / ARTIFACT_MATRIX_FILE, np.ascontiguousarray(matrix[keep]))
+
+    manifest = {
+        "dim":           dim,
+        "hash_mode":     hash_mode,
+        "source_sha256": _file_sha256(KNOWLEDGE_FILE),
+        "chunks":        [chunk for chunk, k in zip(chunks, keep) if k],
+    }
+    (directory / ARTIFACT_MANIFEST_FILE).write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8"
+    )
+    return directory
+
+
+class SearchHit(NamedTuple):
+    chunk_id: int
+    content:  str
+    score:    float
+
+
+class _Snapshot(NamedTuple):
+    """Immutable view of the index — swapped atomically on reload."""
+    ids:      List[int]
+    contents: List[str]
+    matrix:   "np.ndarray"
+    dim:      int
+    version:  Tuple[int, ...]
+    lexical:  Optional["BM25Index"]
+    source:   str = "db"
+
+
+class KnowledgeIndex:
+    """Pre-normalised embedding matrix answering top-k with argpartition."""
+
+    # Row count, max id and total content length catch inserts, deletes and most
+    # edits; the revision row (bumped by scripts/seed_knowledge_base.py on every
+    # change) catches in-place re-embeds that keep ids and content as they were.
+    VERSION_SQL = (
+        "SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(LENGTH(content)), 0) "
+        "FROM knowledge_base "
+        "WHERE embedding IS NOT NULL"
+    )
+    REVISION_TABLE = "knowledge_base_meta"
+    REVISION_SQL   = (
+        "SELECT revision FROM knowledge_base_meta WHERE name = 'knowledge_base'"
+    )
+    LOAD_SQL = (
+        "SELECT id, content, embedding "
+        "FROM knowledge_base "
+        "WHERE embedding IS NOT NULL "
+        "ORDER BY id"
+    )
+
+    def __init__(
+        self,
+        version_check_seconds: Optional[float] = None,
+        source: Optional[str] = None,
+        artifact_dir: Optional[Path] = None,
+    ) -> None:
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock                          = threading.Lock()
+        self._checked_at: float             = 0.0
+        self._check_interval: float         = (
+            get_version_check_seconds_from_env()
+            if version_check_seconds is None else version_check_seconds
+        )
+        self.source                         = source or get_source_from_env()
+        self.artifact_dir                   = Path(artifact_dir or get_artifact_dir_from_env())
+        self._artifact_tried: Optional[int] = None  # dim of the last load attempt
+        self._has_revision: bool            = False
+        self.reloads: int = 0
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        snapshot = self._snapshot
+        return len(snapshot.ids) if snapshot else 0
+
+    @property
+    def loaded_from(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.source if snapshot else None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot       = None
+            self._checked_at     = 0.0
+            self._artifact_tried = None
+            self._has_revision   = False
+
+    # ------------------------------------------------------------------
+    # Loading / freshness
+    # ------------------------------------------------------------------
+    def _revision(self, session) -> int:
+        # Older databases have no revision table until the seed script runs once
+        if not self._has_revision:
+            self._has_revision = inspect(session.get_bind()).has_table(self.REVISION_TABLE)
+            if not self._has_revision:
+                return 0
+        row = session.execute(text(self.REVISION_SQL)).first()
+        return int(row[0] or 0) if row else 0
+
+    def _table_version(self, session) -> Tuple[int, ...]:
+        row = session.execute(text(self.VERSION_SQL)).first()
+        if not row:
+            return (0, 0, 0, self._revision(session))
+        return (int(row[0] or 0), int(row[1] or 0), int(row[2] or 0), self._revision(session))
+
+    def _build(self, session, dim: int, version: Tuple[int, ...]) -> _Snapshot:
+        ids:      List[int] = []
+        contents: List[str] = []
+        vectors:  list      = []
+
+        for chunk_id, content, embedding_payload in session.execute(text(self.LOAD_SQL)):
+            if not content or not embedding_payload:
+                continue
+            vector = decode_embedding(embedding_payload)
+            if vector is None:
+                continue
+            if (vector.dim if isinstance(vector, SparseVector) else vector.shape[0]) != dim:
+                continue
+            ids.append(int(chunk_id))
+            contents.append(content)
+            vectors.append(vector)
+
+        # Dense and sparse rows are scattered into the same contiguous matrix
+        matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            if isinstance(vector, SparseVector):
+                matrix[row, vector.indices] = vector.weights
+            else:
+                matrix[row] = vector
+
+        norms = np.linalg.norm(matrix, axis=1)
+        keep  = norms > 0
+        if not keep.all():
+            ids      = [i for i, k in zip(ids, keep) if k]
+            contents = [c for c, k in zip(contents, keep) if k]
+            matrix   = matrix[keep]
+            norms    = norms[keep]
+        matrix /= norms[:, None]
+
+        return _Snapshot(
+            ids, contents, np.ascontiguousarray(matrix), dim, version, BM25Index(contents)
+        )
+
+    def _load_artifact(self, dim: int) -> Optional[_Snapshot]:
+        """Memory-map the prebuilt matrix; None when missing, stale or built differently."""
+        try:
+            manifest = json.loads(
+                (self.artifact_dir / ARTIFACT_MANIFEST_FILE).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return None
+        if manifest.get("dim") != dim or manifest.get("hash_mode") != get_hash_mode_from_env():
+            return None
+        # Knowledge JSON edited since the build: the DB copy is the one to trust
+        source_sha = _file_sha256(KNOWLEDGE_FILE)
+        if source_sha and manifest.get("source_sha256") not in (None, source_sha):
+            return None
+
+        try:
+            matrix = np.load(self.artifact_dir / ARTIFACT_MATRIX_FILE, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        contents = list(manifest.get("chunks") or [])
+        if matrix.ndim != 2 or matrix.shape != (len(contents), dim) or matrix.dtype != np.float32:
+            return None
+
+        ids = list(range(1, len(contents) + 1))
+        return _Snapshot(
+            ids, contents, matrix, dim, (len(contents), 0), BM25Index(contents), "artifact"
+        )
+
+    def ensure_fresh(self, session, dim: int) -> None:
+        """Use the shipped artifact if present, else reload from the DB when knowledge_base changed."""
+        if not (_NUMPY_AVAILABLE and _EMBEDDINGS_AVAILABLE):
+            return
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.source == "artifact" and snapshot.dim == dim:
+            return
+        if self.source != "db" and self._artifact_tried != dim:
+            with self._lock:
+                if self._artifact_tried != dim:
+                    self._artifact_tried = dim
+                    artifact = self._load_artifact(dim)
+                    if artifact is not None:
+                        self._snapshot = artifact
+                        self.reloads  += 1
+                        return
+        if self.source == "artifact" or session is None or not _SQLALCHEMY_AVAILABLE:
+            return
+
+        now      = time.monotonic()
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and snapshot.dim == dim
+            and (now - self._checked_at) < self._check_interval
+        ):
+            return
+
+        version = self._table_version(session)
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version or snapshot.dim != dim:
+                self._snapshot = self._build(session, dim, version)
+                self.reloads  += 1
+            self._checked_at = now
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _vector_scores(snapshot: _Snapshot, query_vector) -> Optional["np.ndarray"]:
+        if isinstance(query_vector, SparseVector):
+            # Sparse-by-dense: only the query's non-zero columns are touched
+            if query_vector.dim != snapshot.dim or not query_vector.nnz:
+                return None
+            norm = float(np.linalg.norm(query_vector.weights))
+            if norm == 0:
+                return None
+            return snapshot.matrix[:, query_vector.indices] @ (query_vector.weights / norm)
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.ndim != 1 or query.shape[0] != snapshot.dim:
+            return None
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return None
+        return snapshot.matrix @ (query / norm)
+
+    @staticmethod
+    def _rank(scores: "np.ndarray", top_k: int) -> "np.ndarray":
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def _search_vector(self, snapshot: _Snapshot, query_vector, top_k: int) -> List[SearchHit]:
+        scores = self._vector_scores(snapshot, query_vector)
+        if scores is None:
+            return []
+        return [
+            SearchHit(snapshot.ids[i], snapshot.contents[i], float(scores[i]))
+            for i in self._rank(scores, top_k)
+        ]
+
+    def _search_lexical(self, snapshot: _Snapshot, question: str, top_k: int) -> List[SearchHit]:
+        if snapshot.lexical is None:
+            return []
+        return [
+            SearchHit(snapshot.ids[position], snapshot.contents[position], score)
+            for position, score in snapshot.lexical.search(question, top_k)
+        ]
+
+    def search(self, query_vector, top_k: int = 3) -> List[SearchHit]:
+        """Top-k chunks for a dense query or a SparseVector (cosine similarity)."""
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.ids or top_k <= 0:
+            return []
+        return self._search_vector(snapshot, query_vector, top_k)
+
+    def search_lexical(self, question: str, top_k: int = 3) -> List[SearchHit]:
+        """Top-k chunks by BM25, touching only the question's posting lists."""
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.ids or top_k <= 0:
+            return []
+        return self._search_lexical(snapshot, question, top_k)
+
+    def search_hybrid(
+        self,
+        query_vector,
+        question: str,
+        top_k: int = 3,
+        alpha: float = 0.5,
+    ) -> List[SearchHit]:
+        """Fuse max-normalised cosine and BM25 scores: alpha*vector + (1-alpha)*bm25."""
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.ids or top_k <= 0:
+            return []
+
+        pool  = top_k * 4
+        fused: Dict[int, List] = {}
+        for hits, weight in (
+            (self._search_vector(snapshot, query_vector, pool), alpha),
+            (self._search_lexical(snapshot, question, pool), 1.0 - alpha),
+        ):
+            best = max((hit.score for hit in hits), default=0.0)
+            if best <= 0 or weight <= 0:
+                continue
+            for hit in hits:
+                entry = fused.setdefault(hit.chunk_id, [hit.content, 0.0])
+                entry[1] += weight * max(hit.score, 0.0) / best
+
+        ranked = sorted(fused.items(), key=lambda item: item[1][1], reverse=True)[:top_k]
+        return [SearchHit(chunk_id, content, score) for chunk_id, (content, score) in ranked]
+
+
+# Module-level singleton — shared by every request in this process
+knowledge_index = KnowledgeIndex()
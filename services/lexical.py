@@ -0,0 +1,81 @@
+"""
+services/lexical.py
+In-memory BM25 retriever over knowledge_base chunks.
+Posting lists carry precomputed per-document BM25 weights, so a query only
+touches the postings of its own tokens and never scans every chunk.
+Place this file at:  services/lexical.py
+"""
+
+import math
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from services.embeddings import tokenize
+
+DEFAULT_K1 = 1.5
+DEFAULT_B  = 0.75
+
+
+class BM25Index:
+    """Inverted index: token → (document positions, BM25 weights)."""
+
+    def __init__(self, documents: Sequence[str], k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> None:
+        self.k1 = k1
+        self.b  = b
+        self.doc_count = len(documents)
+
+        term_docs: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(self.doc_count, dtype=np.float32)
+        for position, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            lengths[position] = sum(counts.values())
+            for token, tf in counts.items():
+                term_docs.setdefault(token, []).append((position, tf))
+
+        avg_length = float(lengths.mean()) if self.doc_count else 0.0
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for token, entries in term_docs.items():
+            doc_ids = np.fromiter((p for p, _ in entries), dtype=np.int32, count=len(entries))
+            tf      = np.fromiter((t for _, t in entries), dtype=np.float32, count=len(entries))
+            df      = len(entries)
+            idf     = math.log(1.0 + (self.doc_count - df + 0.5) / (df + 0.5))
+            norm    = k1 * (1.0 - b + b * lengths[doc_ids] / (avg_length or 1.0))
+            weights = (idf * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32)
+            self._postings[token] = (doc_ids, weights)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(document positions, scores) for every document matching a query token."""
+        postings = [
+            (self._postings[token], count)
+            for token, count in Counter(tokenize(query)).items()
+            if token in self._postings
+        ]
+        if not postings:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        if len(postings) == 1:
+            (doc_ids, weights), count = postings[0]
+            return doc_ids, weights * count
+
+        doc_ids = np.concatenate([ids for (ids, _), _ in postings])
+        weights = np.concatenate([w * count for (_, w), count in postings])
+        unique_ids, inverse = np.unique(doc_ids, return_inverse=True)
+        return unique_ids, np.bincount(inverse, weights=weights).astype(np.float32)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """Top-k (document position, score) pairs, best first."""
+        doc_ids, scores = self.scores(query)
+        if top_k <= 0 or not doc_ids.shape[0]:
+            return []
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(doc_ids[i]), float(scores[i])) for i in ranked]
@@ -0,0 +1,144 @@
+"""
+services/pagination.py
+Keyset (cursor) pagination for SQLAlchemy list queries.
+A page is fetched with `WHERE (sort keys) < (last row's keys) ORDER BY ... LIMIT n`,
+so every page costs one index range scan no matter how deep the client goes.
+Cursors are opaque URL-safe base64 JSON of the last row's sort-key values.
+Nullable sort keys are supported: NULL sorts below every value (MySQL and
+SQLite do this natively; other backends get explicit NULLS FIRST/LAST), and
+the cursor condition handles NULL explicitly, since `col < NULL` matches nothing.
+Place this file at:  services/pagination.py
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE     = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` cursor cannot be decoded for the requested listing."""
+
+
+def parse_limit(raw: Optional[str], default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Clamp a `limit` query parameter to 1..MAX_PAGE_SIZE."""
+    try:
+        value = int(raw) if raw not in (None, "") else default
+    except (TypeError, ValueError):
+        value = default
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match this listing")
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise InvalidCursor(f"Invalid pagination cursor: {exc}") from exc
+
+
+# Backends whose default ordering already treats NULL as the smallest value
+NULLS_SMALLEST_DIALECTS = ("mysql", "mariadb", "sqlite")
+
+
+def _nullable(column) -> bool:
+    return bool(getattr(getattr(column, "expression", column), "nullable", True))
+
+
+def _equals(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _past(column, descending: bool, value, nullable: bool):
+    """Rows strictly after `value` in this key alone, with NULL below every value."""
+    if value is None:
+        # Nothing sorts below NULL; ascending, every non-NULL value comes after it
+        return false() if descending else column.isnot(None)
+    if descending:
+        return or_(column < value, column.is_(None)) if nullable else column < value
+    return column > value
+
+
+def _after_clause(keys: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """(k1, k2, ...) strictly past `values`, expanded to OR-of-ANDs for MySQL's range optimizer."""
+    branches = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [_equals(keys[j][0], values[j]) for j in range(i)]
+        step         = _past(column, descending, values[i], _nullable(column))
+        branches.append(and_(*equal_prefix, step))
+    return or_(*branches)
+
+
+def _ordering(keys: Sequence[Tuple[Any, bool]], dialect: Optional[str]) -> list:
+    ordering = []
+    for column, descending in keys:
+        term = column.desc() if descending else column.asc()
+        if _nullable(column) and dialect not in NULLS_SMALLEST_DIALECTS:
+            term = term.nulls_last() if descending else term.nulls_first()
+        ordering.append(term)
+    return ordering
+
+
+def keyset_page(
+    query,
+    keys: Sequence[Tuple[Any, bool]],
+    limit: Optional[int],
+    after: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of `query` ordered by `keys` — (column, descending) pairs that
+    must end with a unique column (the primary key). Returns (rows, next_cursor);
+    next_cursor is None on the last page. limit=None returns every remaining row.
+    """
+    columns = [column for column, _ in keys]
+    if after:
+        query = query.filter(_after_clause(keys, decode_cursor(after, columns)))
+    try:
+        dialect = query.session.get_bind().dialect.name
+    except Exception:
+        dialect = None
+    ordering = _ordering(keys, dialect)
+    query    = query.order_by(None).order_by(*ordering)
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
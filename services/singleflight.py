@@ -0,0 +1,60 @@
+"""
+services/singleflight.py
+Per-key single-flight: concurrent callers asking for the same key while a
+load is running wait for that load and share its result (or exception)
+instead of each hitting the upstream service.
+Place this file at:  services/singleflight.py
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done                         = threading.Event()
+        self.result: Any                  = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent `do(key, fn)` calls into one execution of `fn` per key."""
+
+    def __init__(self) -> None:
+        self._lock                          = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions                     = 0   # loads actually run
+        self.shared                         = 0   # callers served by someone else's load
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call   = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
@@ -1,18 +1,28 @@
 """
 services/weather.py
 WeatherAPI wrapper with caching, graceful fallbacks, and Vercel-safe imports.
+The forecast cache is stale-while-revalidate: past the soft TTL the last good
+payload is still served while one background thread refreshes it; only past
+the hard TTL (or on a cold start) is there nothing to serve. An optional
+shared store (services/weather_store.py) lets workers and serverless
+instances reuse each other's fetches.
 Place this file at:  services/weather.py
 """
 
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 # ---------------------------------------------------------------------------
 # Safe import of requests — gives a clear error on Vercel if still missing
 # ---------------------------------------------------------------------------
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     _REQUESTS_AVAILABLE = True
 except ModuleNotFoundError:
     _REQUESTS_AVAILABLE = False
@@ -23,6 +33,9 @@ except ModuleNotFoundError:
 # ---------------------------------------------------------------------------
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from services.singleflight import SingleFlight
+from services.weather_store import weather_store_from_env
+
 
 # ---------------------------------------------------------------------------
 # Fallback payload used whenever we cannot reach the weather API
@@ -41,6 +54,14 @@ _UNAVAILABLE: Dict[str, Any] = {
 }
 
 
+def _seconds_from_env(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
 class WeatherService:
     """Simple WeatherAPI wrapper with in-process caching and graceful fallbacks."""
 
@@ -49,11 +70,20 @@ class WeatherService:
     DEFAULT_LOCATION = "Kigali,Rwanda"
 
     # Cache TTLs
-    CACHE_TTL_SECONDS         = 600   # 10 minutes  – main forecast
+    CACHE_TTL_SECONDS         = 600   # 10 minutes  – main forecast (soft TTL default)
+    HARD_TTL_SECONDS          = 3600  # 1 hour      – oldest forecast we will still serve
+    ERROR_RETRY_SECONDS       = 60    # back-off after a failed refresh
+    LEASE_SECONDS             = 45    # how long one process may hold the shared refresh
+    SHARED_POLL_SECONDS       = 5     # min gap between shared-store lookups per process
     DISTRICT_CACHE_TTL_SECONDS = 1800  # 30 minutes – district snapshots
 
     MAX_DISTRICT_WORKERS = 8
 
+    # Transient upstream failures are retried with backoff; 429 is not (see _format_request_error)
+    HTTP_RETRIES        = 2
+    HTTP_BACKOFF        = 0.3
+    HTTP_RETRY_STATUSES = (500, 502, 503, 504)
+
     RWANDA_DISTRICTS: List[Dict[str, str]] = [
         {"name": "Nyarugenge",  "query": "Nyarugenge,Rwanda"},
         {"name": "Gasabo",      "query": "Gasabo,Rwanda"},
@@ -87,11 +117,43 @@ class WeatherService:
         {"name": "Rutsiro",     "query": "Rutsiro,Rwanda"},
     ]
 
-    def __init__(self) -> None:
+    def __init__(self, shared: Optional[Any] = None) -> None:
         self._cache: Optional[Dict[str, Any]]          = None
         self._cache_timestamp: float                    = 0.0
         self._district_cache: Optional[Dict[str, Any]] = None
         self._district_cache_timestamp: float          = 0.0
+        # Per-district snapshots, each with its own timestamp: name -> (snapshot, fetched_at)
+        self._district_entries: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._district_index                           = {d["name"].lower(): d for d in self.RWANDA_DISTRICTS}
+        self.district_ttl                              = _seconds_from_env(
+            "WEATHER_DISTRICT_TTL_SECONDS", self.DISTRICT_CACHE_TTL_SECONDS)
+        self.soft_ttl                                  = _seconds_from_env(
+            "WEATHER_SOFT_TTL_SECONDS", self.CACHE_TTL_SECONDS)
+        self.hard_ttl                                  = max(self.soft_ttl, _seconds_from_env(
+            "WEATHER_HARD_TTL_SECONDS", self.HARD_TTL_SECONDS))
+        self._retry_after: float                       = 0.0
+        self._refresh_lock                             = threading.Lock()
+        self._refresh_done: Optional[threading.Event]  = None
+        self.background_refreshes                      = 0
+        # One upstream fetch per cache key ("forecast", "districts") at a time
+        self._flight                                   = SingleFlight()
+        self._state_lock                               = threading.Lock()
+        # Optional cross-process store; None keeps the cache per process
+        self.shared                                    = shared
+        self._owner                                    = uuid.uuid4().hex
+        self._shared_checked_at: float                 = 0.0
+        self.shared_hits                               = 0
+        # Long-lived keep-alive session and district pool, created on first refresh
+        self._http: Optional[Any]                      = None
+        self._district_executor: Optional[ThreadPoolExecutor] = None
+        self._pool_lock                                = threading.Lock()
+        # Set by services/weather_prefetch.py; while it runs, reads never call WeatherAPI
+        self.prefetcher: Optional[Any]                 = None
+        self.last_upstream_status: Optional[int]       = None
+
+    @property
+    def prefetch_active(self) -> bool:
+        return self.prefetcher is not None and self.prefetcher.running
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -105,15 +167,128 @@ class WeatherService:
         )
 
     def invalidate(self) -> None:
-        self._cache                    = None
-        self._cache_timestamp          = 0.0
-        self._district_cache           = None
-        self._district_cache_timestamp = 0.0
+        with self._state_lock:
+            self._cache                    = None
+            self._cache_timestamp          = 0.0
+            self._district_cache           = None
+            self._district_cache_timestamp = 0.0
+            self._district_entries         = {}
+            self._retry_after              = 0.0
+
+    def _session(self):
+        """Shared requests.Session: one keep-alive pool sized for the district fan-out."""
+        with self._pool_lock:
+            if self._http is None:
+                retry = Retry(
+                    total=self.HTTP_RETRIES,
+                    backoff_factor=self.HTTP_BACKOFF,
+                    status_forcelist=self.HTTP_RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=2,
+                    pool_maxsize=self.MAX_DISTRICT_WORKERS + 2,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http = session
+            return self._http
+
+    def _district_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._district_executor is None:
+                self._district_executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_DISTRICT_WORKERS, thread_name_prefix="weather-district")
+            return self._district_executor
+
+    def use_shared_backend(self, shared: Optional[Any]) -> None:
+        self.shared             = shared
+        self._shared_checked_at = 0.0
+
+    def _store_forecast(self, payload: Dict[str, Any], now: float) -> None:
+        with self._state_lock:
+            self._cache           = payload
+            self._cache_timestamp = now
+
+    def _store_districts(self, payload: Dict[str, Any], now: float) -> None:
+        with self._state_lock:
+            self._district_cache           = payload
+            self._district_cache_timestamp = now
+
+    def _adopt_shared(self, key: str, now: float, force: bool = False) -> None:
+        """Pull a newer payload for `key` from the shared store into this process."""
+        if self.shared is None:
+            return
+        if not force and key == "forecast":
+            if now - self._shared_checked_at < self.SHARED_POLL_SECONDS:
+                return
+            self._shared_checked_at = now
+        try:
+            entry = self.shared.get(key)
+        except Exception:
+            # The shared store is an optimisation — fall back to WeatherAPI
+            return
+        if not entry:
+            return
+        payload, stored_at = entry
+        with self._state_lock:
+            if key == "forecast" and stored_at > self._cache_timestamp:
+                self._cache, self._cache_timestamp = payload, stored_at
+                self.shared_hits += 1
+            elif key == "districts" and stored_at > self._district_cache_timestamp:
+                self._district_cache, self._district_cache_timestamp = payload, stored_at
+
+    def _publish(self, key: str, payload: Dict[str, Any], now: float) -> None:
+        if self.shared is None:
+            return
+        try:
+            self.shared.put(key, payload, now)
+        except Exception:
+            pass
+
+    def _usable(self, now: float) -> Optional[Dict[str, Any]]:
+        """Cached payload that may still be served: errors until their retry, forecasts until the hard TTL."""
+        with self._state_lock:
+            cached, stored_at = self._cache, self._cache_timestamp
+        if self.shared is not None and (not cached or now - stored_at >= self.soft_ttl):
+            self._adopt_shared("forecast", now)
+            with self._state_lock:
+                cached, stored_at = self._cache, self._cache_timestamp
+        if not cached:
+            return None
+        limit = self.ERROR_RETRY_SECONDS if cached.get("error") else self.hard_ttl
+        return cached if (now - stored_at) < limit else None
+
+    def peek(self) -> Dict[str, Any]:
+        """Last servable payload, without any network call."""
+        cached = self._usable(time.time())
+        if cached:
+            return cached
+        district_bundle = self._cached_district_bundle()
+        refreshing      = (self._refresh_done is not None or self._flight.in_flight("forecast")
+                           or self.prefetch_active)
+        return {
+            **_UNAVAILABLE,
+            "error":                ("Weather is still loading. Refresh in a moment."
+                                     if refreshing else _UNAVAILABLE["error"]),
+            "districts":            district_bundle.get("districts", []),
+            "districts_error":      district_bundle.get("error"),
+            "districts_updated_at": district_bundle.get("updated_at"),
+        }
 
     # ------------------------------------------------------------------
     # Main entry point
     # ------------------------------------------------------------------
-    def get_weather(self, force_refresh: bool = False) -> Dict[str, Any]:
+    def get_weather(self, force_refresh: bool = False, wait: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Forecast + district snapshot. Fresh and stale-but-servable payloads return
+        immediately (a stale one also starts a background refresh). With nothing to
+        serve, wait up to `wait` seconds for the refresh (None = until it finishes,
+        0 = never) and return the loading placeholder if it is still running.
+        """
         # If requests is not installed, return a clean fallback immediately
         if not _REQUESTS_AVAILABLE:
             return {
@@ -124,14 +299,96 @@ class WeatherService:
                 ),
             }
 
-        now = time.time()
-        if (
-            not force_refresh
-            and self._cache
-            and (now - self._cache_timestamp) < self.CACHE_TTL_SECONDS
-        ):
-            return self._cache
+        if force_refresh:
+            return self._flight.do("forecast", lambda: self._refresh(force_refresh=True))
 
+        now    = time.time()
+        if self.prefetch_active:
+            # The prefetcher keeps every entry warm on its own schedule; districts
+            # are refreshed separately from the forecast, so splice in the latest
+            payload = self._usable(now) or self.peek()
+            bundle  = self._assemble_district_bundle(now)
+            return {
+                **payload,
+                "districts":            bundle["districts"],
+                "districts_error":      bundle["error"],
+                "districts_updated_at": bundle["updated_at"],
+            }
+        cached = self._usable(now)
+        if cached:
+            fresh_for = self.ERROR_RETRY_SECONDS if cached.get("error") else self.soft_ttl
+            if (now - self._cache_timestamp) >= fresh_for:
+                self.refresh_in_background()
+            return cached
+
+        done = self.refresh_in_background()
+        if wait is None or wait > 0:
+            done.wait(wait)
+        return self.peek()
+
+    def refresh_in_background(self) -> threading.Event:
+        """Start a refresh unless one is running or backing off (single-flight); the Event is set when it ends."""
+        with self._refresh_lock:
+            if self._refresh_done is not None:
+                return self._refresh_done
+            if time.time() < self._retry_after:
+                idle = threading.Event()
+                idle.set()
+                return idle
+            done = self._refresh_done = threading.Event()
+            self.background_refreshes += 1
+        threading.Thread(target=self._run_refresh, args=(done,),
+                         name="weather-refresh", daemon=True).start()
+        return done
+
+    def _run_refresh(self, done: threading.Event) -> None:
+        try:
+            self._flight.do("forecast", self._refresh)
+        except Exception:
+            pass
+        finally:
+            with self._refresh_lock:
+                self._refresh_done = None
+            done.set()
+
+    def _refresh(self, force_refresh: bool = False) -> Dict[str, Any]:
+        if self.shared is None or force_refresh:
+            return self._fetch(force_refresh)
+
+        # Another process may already have refreshed, or be refreshing right now
+        now = time.time()
+        self._adopt_shared("forecast", now, force=True)
+        cached = self._usable(now)
+        if cached and not cached.get("error") and now - self._cache_timestamp < self.soft_ttl:
+            return cached
+        try:
+            leased = self.shared.acquire_lease("forecast", self._owner, self.LEASE_SECONDS)
+        except Exception:
+            return self._fetch()
+        if not leased:
+            return self._wait_for_shared(now)
+        try:
+            return self._fetch()
+        finally:
+            try:
+                self.shared.release_lease("forecast", self._owner)
+            except Exception:
+                pass
+
+    def _wait_for_shared(self, since: float) -> Dict[str, Any]:
+        """Poll the shared store until the lease holder publishes (or its lease runs out)."""
+        deadline = since + self.LEASE_SECONDS
+        while time.time() < deadline:
+            now = time.time()
+            self._adopt_shared("forecast", now, force=True)
+            cached = self._cache
+            if cached and not cached.get("error") and now - self._cache_timestamp < self.soft_ttl:
+                return cached
+            time.sleep(0.25)
+        return self.peek()
+
+    def _fetch(self, force_refresh: bool = False) -> Dict[str, Any]:
+        now = time.time()
         key = self._api_key()
         if not key:
             return {
@@ -151,7 +408,7 @@ class WeatherService:
         }
 
         try:
-            response = requests.get(self.API_URL, params=params, timeout=8)
+            response = self._session().get(self.API_URL, params=params, timeout=8)
             response.raise_for_status()
             payload = response.json()
             data    = self._normalize(payload)
@@ -161,11 +418,19 @@ class WeatherService:
             data["districts_error"]    = district_bundle.get("error")
             data["districts_updated_at"] = district_bundle.get("updated_at")
 
-            self._cache           = data
-            self._cache_timestamp = now
+            self._store_forecast(data, now)
+            self._publish("forecast", data, now)
+            self._retry_after = 0.0
             return data
 
         except Exception as exc:
+            self.last_upstream_status = getattr(getattr(exc, "response", None), "status_code", None)
+            # Keep serving the last good forecast (until the hard TTL) and retry later
+            previous = self._cache
+            if previous and not previous.get("error") and (now - self._cache_timestamp) < self.hard_ttl:
+                self._retry_after = now + self.ERROR_RETRY_SECONDS
+                return previous
+
             friendly_error  = self._format_request_error(exc)
             district_bundle = self._cached_district_bundle()
             error_payload   = {
@@ -176,8 +441,7 @@ class WeatherService:
                 "districts_updated_at":   district_bundle.get("updated_at"),
             }
             # Still cache the error so we don't hammer the API
-            self._cache           = error_payload
-            self._cache_timestamp = now
+            self._store_forecast(error_payload, now)
             return error_payload
 
     # ------------------------------------------------------------------
@@ -252,7 +516,7 @@ class WeatherService:
     def _fetch_district_snapshot(self, key: str, district: Dict[str, str]) -> Dict[str, Any]:
         query = district.get("query") or f"{district['name']},Rwanda"
         try:
-            response = requests.get(
+            response = self._session().get(
                 self.DISTRICT_API_URL,
                 params={"key": key, "q": query},
                 timeout=6,
@@ -294,13 +558,40 @@ class WeatherService:
             }
 
         now = time.time()
+        if self.prefetch_active and not force_refresh:
+            # Districts are prefetched one at a time; never burst 30 calls here
+            return self._assemble_district_bundle(now)
+        if not force_refresh:
+            self._adopt_shared("districts", now)
+        with self._state_lock:
+            cached, stored_at = self._district_cache, self._district_cache_timestamp
         if (
             not force_refresh
-            and self._district_cache
-            and (now - self._district_cache_timestamp) < self.DISTRICT_CACHE_TTL_SECONDS
+            and cached
+            and (now - stored_at) < self.district_ttl
         ):
-            return self._district_cache
+            return cached
+
+        # Concurrent misses share one 30-district fan-out
+        return self._flight.do("districts", lambda: self._load_rwanda_district_weather(key))
+
+    def _assemble_district_bundle(self, now: float) -> Dict[str, Any]:
+        """The district bundle built from per-district entries, without upstream calls."""
+        with self._state_lock:
+            entries = dict(self._district_entries)
+        districts = [entries[d["name"]][0] for d in self.RWANDA_DISTRICTS
+                     if d["name"] in entries and not entries[d["name"]][0].get("error")]
+        pending   = len(self.RWANDA_DISTRICTS) - len(districts)
+        fetched   = [entries[d["name"]][1] for d in self.RWANDA_DISTRICTS if d["name"] in entries]
+        return {
+            "error":      (f"{pending} district(s) not loaded yet." if pending else None),
+            "districts":  districts,
+            "updated_at": (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(max(fetched)))
+                           if fetched else None),
+        }
 
+    def _load_rwanda_district_weather(self, key: str) -> Dict[str, Any]:
+        now       = time.time()
         order_map = {d["name"]: i for i, d in enumerate(self.RWANDA_DISTRICTS)}
         results:  List[Dict[str, Any]] = []
         failures: List[Dict[str, Any]] = []
@@ -310,8 +601,7 @@ class WeatherService:
         if baseline.get("error"):
             if baseline.get("status_code") in (401, 403):
                 payload = self._auth_error_payload()
-                self._district_cache           = payload
-                self._district_cache_timestamp = now
+                self._store_districts(payload, now)
                 return payload
             failures.append(baseline)
         else:
@@ -319,19 +609,17 @@ class WeatherService:
 
         remaining = self.RWANDA_DISTRICTS[1:]
         if remaining:
-            with ThreadPoolExecutor(
-                max_workers=min(self.MAX_DISTRICT_WORKERS, len(remaining))
-            ) as executor:
-                futures = {
-                    executor.submit(self._fetch_district_snapshot, key, d): d
-                    for d in remaining
-                }
-                for future in as_completed(futures):
-                    result = future.result()
-                    if result.get("error"):
-                        failures.append(result)
-                    else:
-                        results.append(result)
+            executor = self._district_pool()
+            futures  = {
+                executor.submit(self._fetch_district_snapshot, key, d): d
+                for d in remaining
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result.get("error"):
+                    failures.append(result)
+                else:
+                    results.append(result)
 
         results.sort(key=lambda item: order_map.get(item["name"], 0))
 
@@ -346,10 +634,211 @@ class WeatherService:
             )
             payload["failures"] = failures
 
-        self._district_cache           = payload
-        self._district_cache_timestamp = now
+        self._store_districts(payload, now)
+        with self._state_lock:
+            for snapshot in results + failures:
+                self._district_entries[snapshot["name"]] = (snapshot, now)
+        if results:
+            self._publish("districts", payload, now)
         return payload
 
+    # ------------------------------------------------------------------
+    # Per-district lookups (no Kigali forecast, no other districts)
+    # ------------------------------------------------------------------
+    def resolve_district(self, name: str) -> Optional[Dict[str, str]]:
+        return self._district_index.get((name or "").strip().lower())
+
+    def _district_entry(self, name: str, now: float, stale_ok: bool = False) -> Optional[Dict[str, Any]]:
+        """Cached snapshot for one district: its own entry, else the bundle if that is fresh.
+        stale_ok serves good entries up to the hard TTL (the prefetcher is refreshing them)."""
+        with self._state_lock:
+            entry  = self._district_entries.get(name)
+            bundle = self._district_cache if (now - self._district_cache_timestamp) < self.district_ttl else None
+        if entry is not None:
+            snapshot, fetched_at = entry
+            if snapshot.get("error"):
+                limit = self.ERROR_RETRY_SECONDS
+            else:
+                limit = max(self.district_ttl, self.hard_ttl) if stale_ok else self.district_ttl
+            if (now - fetched_at) < limit:
+                return snapshot
+        for snapshot in (bundle or {}).get("districts", []):
+            if snapshot.get("name") == name:
+                return snapshot
+        return None
+
+    def _refresh_district(self, key: str, district: Dict[str, str]) -> Dict[str, Any]:
+        name = district["name"]
+        now  = time.time()
+        # Whoever held the flight before us may have just stored it
+        cached = self._district_entry(name, now)
+        if cached is not None:
+            return cached
+        if self.shared is not None:
+            try:
+                entry = self.shared.get(f"district:{name}")
+            except Exception:
+                entry = None
+            if entry and (now - entry[1]) < self.district_ttl:
+                with self._state_lock:
+                    self._district_entries[name] = entry
+                return entry[0]
+
+        snapshot = self._fetch_district(key, district)
+        if snapshot.get("error"):
+            # Prefer the last good snapshot (up to the hard TTL) over an error
+            return self._district_entry(district["name"], time.time(), stale_ok=True) or snapshot
+        return snapshot
+
+    def _fetch_district(self, key: str, district: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch one district from WeatherAPI, store it and publish it to the shared store."""
+        now      = time.time()
+        snapshot = self._fetch_district_snapshot(key, district)
+        with self._state_lock:
+            previous = self._district_entries.get(district["name"])
+            if (snapshot.get("error") and previous and not previous[0].get("error")
+                    and (now - previous[1]) < self.hard_ttl):
+                # Keep the last good snapshot; the caller sees the error and retries later
+                return snapshot
+            self._district_entries[district["name"]] = (snapshot, now)
+        if not snapshot.get("error"):
+            self._publish(f"district:{district['name']}", snapshot, now)
+        return snapshot
+
+    def cache_version(self) -> Tuple[str, float]:
+        """(version, fetched_at) of the bundle get_weather serves; the version changes whenever its content can."""
+        with self._state_lock:
+            district_times = [fetched_at for _, fetched_at in self._district_entries.values()]
+            version = (f"{self._cache_timestamp:.3f}:{self._district_cache_timestamp:.3f}:"
+                       f"{max(district_times, default=0.0):.3f}")
+            return version, self._cache_timestamp
+
+    def district_version(self, names: Iterable[str]) -> Tuple[str, float]:
+        """(version, oldest fetched_at) for the named districts' entries."""
+        with self._state_lock:
+            times = []
+            for name in names:
+                district = self.resolve_district(name)
+                entry    = self._district_entries.get(district["name"]) if district else None
+                times.append((district["name"] if district else name, entry[1] if entry else 0.0))
+        version = "|".join(f"{name}:{fetched_at:.3f}" for name, fetched_at in times)
+        return version, min((fetched_at for _, fetched_at in times), default=0.0)
+
+    def freshness(self) -> Dict[str, Any]:
+        """Age of the forecast and of every district entry, for /api/weather/status."""
+        now = time.time()
+
+        def describe(payload: Optional[Dict[str, Any]], fetched_at: float, ttl: float) -> Dict[str, Any]:
+            if not payload:
+                return {"fetched_at": None, "age_seconds": None, "fresh": False, "error": None}
+            age = now - fetched_at
+            return {
+                "fetched_at":  time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(fetched_at)),
+                "age_seconds": round(age, 1),
+                "fresh":       age < ttl and not payload.get("error"),
+                "error":       payload.get("error"),
+            }
+
+        with self._state_lock:
+            forecast = describe(self._cache, self._cache_timestamp, self.soft_ttl)
+            entries  = dict(self._district_entries)
+        districts = []
+        for district in self.RWANDA_DISTRICTS:
+            snapshot, fetched_at = entries.get(district["name"], (None, 0.0))
+            districts.append({"name": district["name"],
+                              **describe(snapshot, fetched_at, self.district_ttl)})
+        return {
+            "forecast":             forecast,
+            "districts":            districts,
+            "fresh_districts":      sum(1 for d in districts if d["fresh"]),
+            "district_ttl_seconds": self.district_ttl,
+            "soft_ttl_seconds":     self.soft_ttl,
+            "hard_ttl_seconds":     self.hard_ttl,
+        }
+
+    def get_districts(self, names: Iterable[str], force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Snapshots for just the named districts, each served from its own cache
+        entry and refetched individually (concurrently) when missing or expired.
+        Unknown names are listed under "unknown".
+        """
+        wanted:  List[Dict[str, str]] = []
+        unknown: List[str]            = []
+        for name in names:
+            district = self.resolve_district(name)
+            if district is None:
+                unknown.append(name)
+            elif district not in wanted:
+                wanted.append(district)
+
+        result: Dict[str, Any] = {
+            "error":           None,
+            "districts":       [],
+            "districts_error": None,
+            "unknown":         unknown,
+            "updated_at":      time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+        }
+        if not _REQUESTS_AVAILABLE:
+            result["error"] = "The 'requests' package is not installed."
+            return result
+        key = self._api_key()
+
+        now       = time.time()
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        missing:   List[Dict[str, str]]      = []
+        for district in wanted:
+            cached = None if force_refresh else self._district_entry(
+                district["name"], now, stale_ok=self.prefetch_active)
+            if cached is not None:
+                snapshots[district["name"]] = cached
+            else:
+                missing.append(district)
+
+        if force_refresh:
+            with self._state_lock:
+                for district in missing:
+                    self._district_entries.pop(district["name"], None)
+        if missing and self.prefetch_active and not force_refresh:
+            # Page loads never call WeatherAPI while the prefetcher runs; it will get there
+            for district in missing:
+                snapshots[district["name"]] = {"name": district["name"],
+                                               "error": "Not loaded yet; refresh in a moment."}
+        elif len(missing) == 1:
+            district = missing[0]
+            snapshots[district["name"]] = self._flight.do(
+                f"district:{district['name']}", partial(self._refresh_district, key, district))
+        elif missing:
+            executor = self._district_pool()
+            futures  = {
+                district["name"]: executor.submit(
+                    self._flight.do, f"district:{district['name']}",
+                    partial(self._refresh_district, key, district))
+                for district in missing
+            }
+            for name, future in futures.items():
+                snapshots[name] = future.result()
+
+        ordered  = [snapshots[d["name"]] for d in wanted]
+        failures = [s for s in ordered if s.get("error")]
+        result["districts"] = [s for s in ordered if not s.get("error")]
+        if failures:
+            result["districts_error"] = (
+                f"{len(failures)} of {len(ordered)} district(s) unavailable: "
+                + ", ".join(s["name"] for s in failures)
+            )
+            result["failures"] = failures
+        return result
+
+    def get_district(self, name: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """One district's snapshot (with an "error" key if it could not be fetched); None if unknown."""
+        district = self.resolve_district(name)
+        if district is None:
+            return None
+        batch = self.get_districts([district["name"]], force_refresh=force_refresh)
+        if batch.get("error"):
+            return {"name": district["name"], "error": batch["error"]}
+        return (batch["districts"] or batch.get("failures"))[0]
+
     # ------------------------------------------------------------------
     # Small private helpers
     # ------------------------------------------------------------------
@@ -388,4 +877,4 @@ class WeatherService:
 
 # Module-level singleton — imported by app.py as:
 #   from services.weather import weather_service
-weather_service = WeatherService()
\ No newline at end of file
+weather_service = WeatherService(shared=weather_store_from_env())
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+services/weather_prefetch.py
+Background prefetcher that keeps the WeatherService cache warm on a rolling
+schedule: the Kigali forecast and each of the 30 districts are refreshed one
+call at a time, spaced by a calls-per-minute budget, shortly before they
+expire. While it runs, page loads are served from cache only and never call
+WeatherAPI, and the upstream sees a steady trickle instead of 31-call bursts.
+With a shared weather store, one process (the lease holder) prefetches and
+the others copy its results from the store.
+Place this file at:  services/weather_prefetch.py
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALLS_PER_MINUTE = 30
+REFRESH_AT_FRACTION      = 0.8   # refresh entries at 80% of their TTL
+RATE_LIMIT_PAUSE         = 120   # seconds to back off after a 429
+FORECAST                 = "forecast"
+
+
+def prefetch_enabled_from_env() -> bool:
+    """WEATHER_PREFETCH=true turns the scheduler on (long-running servers only)."""
+    return os.getenv("WEATHER_PREFETCH", "false").strip().lower() in ("1", "true", "yes")
+
+
+def get_calls_per_minute_from_env() -> float:
+    try:
+        value = float(os.getenv("WEATHER_PREFETCH_CALLS_PER_MINUTE", DEFAULT_CALLS_PER_MINUTE))
+    except ValueError:
+        return DEFAULT_CALLS_PER_MINUTE
+    return value if value > 0 else DEFAULT_CALLS_PER_MINUTE
+
+
+class WeatherPrefetcher:
+    """Rolling, rate-budgeted refresh of the forecast and every district for one WeatherService."""
+
+    def __init__(self, service, calls_per_minute: Optional[float] = None) -> None:
+        self.service          = service
+        self.calls_per_minute = calls_per_minute or get_calls_per_minute_from_env()
+        self.interval         = 60.0 / self.calls_per_minute
+        self._next_due: Dict[str, float] = {}
+        self._stop            = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock            = threading.Lock()
+        self.role             = "standalone"   # or "leader" / "follower" with a shared store
+        self.upstream_calls   = 0
+        self.failures         = 0
+        self.rate_limited     = 0
+        self.last_call_at: Optional[float] = None
+        self.last_item: Optional[str]      = None
+        self.paused_until     = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return (self._thread is not None and self._thread.is_alive()
+                and self._pid == os.getpid() and not self._stop.is_set())
+
+    def start(self) -> "WeatherPrefetcher":
+        """Start (or restart in a forked worker); safe to call on every request."""
+        if self.running:
+            return self
+        with self._lock:
+            if self.running:
+                return self
+            self._stop.clear()
+            self._pid    = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="weather-prefetch", daemon=True)
+            self.service.prefetcher = self
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Schedule
+    # ------------------------------------------------------------------
+    def _items(self) -> List[str]:
+        return [FORECAST] + [d["name"] for d in self.service.RWANDA_DISTRICTS]
+
+    def _initial_due(self, item: str) -> float:
+        """Due time from what is already cached (e.g. adopted from the shared store)."""
+        service = self.service
+        if item == FORECAST:
+            cached, fetched_at = service._cache, service._cache_timestamp
+            ttl = service.soft_ttl
+        else:
+            cached, fetched_at = service._district_entries.get(item, (None, 0.0))
+            ttl = service.district_ttl
+        if not cached or cached.get("error"):
+            return 0.0
+        return fetched_at + ttl * REFRESH_AT_FRACTION
+
+    def _next_item(self, now: float) -> Optional[str]:
+        """The most overdue item, or None when nothing is due yet."""
+        for item in self._items():
+            if item not in self._next_due:
+                self._next_due[item] = self._initial_due(item)
+        item, due = min(self._next_due.items(), key=lambda pair: pair[1])
+        return item if due <= now else None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            now = time.time()
+            if now < self.paused_until:
+                self._stop.wait(self.paused_until - now)
+                continue
+            item = self._next_item(now)
+            if item is None:
+                self._stop.wait(min(self.interval, max(0.0, min(self._next_due.values()) - now)) or self.interval)
+                continue
+            try:
+                self._run(item)
+            except Exception as exc:
+                logger.warning("Weather prefetch of %s failed: %s", item, exc)
+                self._next_due[item] = time.time() + self.service.ERROR_RETRY_SECONDS
+            # Rate budget: at most one upstream call per interval
+            self._stop.wait(self.interval)
+
+    def _is_leader(self) -> bool:
+        shared = self.service.shared
+        if shared is None:
+            self.role = "standalone"
+            return True
+        try:
+            leader = shared.acquire_lease("prefetch", self.service._owner, self.interval * 4)
+        except Exception:
+            leader = True
+        self.role = "leader" if leader else "follower"
+        return leader
+
+    def _run(self, item: str) -> None:
+        service = self.service
+        now     = time.time()
+        ttl     = service.soft_ttl if item == FORECAST else service.district_ttl
+
+        if not self._is_leader():
+            # Another process prefetches; copy what it published
+            if item == FORECAST:
+                service._adopt_shared(FORECAST, now, force=True)
+            else:
+                entry = service.shared.get(f"district:{item}")
+                if entry:
+                    with service._state_lock:
+                        current = service._district_entries.get(item)
+                        if current is None or entry[1] > current[1]:
+                            service._district_entries[item] = entry
+            self._next_due[item] = self._initial_due(item) or now + self.interval
+            return
+
+        key = service._api_key()
+        self.upstream_calls += 1
+        self.last_call_at    = now
+        self.last_item       = item
+        if item == FORECAST:
+            payload = service._flight.do(FORECAST, service._fetch)
+            failed  = bool(payload.get("error")) or service._cache_timestamp < now
+            status  = service.last_upstream_status if failed else None
+        else:
+            district = service.resolve_district(item)
+            snapshot = service._flight.do(f"district:{item}",
+                                          lambda: service._fetch_district(key, district))
+            failed   = bool(snapshot.get("error"))
+            status   = snapshot.get("status_code")
+
+        if not failed:
+            self._next_due[item] = now + ttl * REFRESH_AT_FRACTION
+            return
+        self.failures += 1
+        self._next_due[item] = now + service.ERROR_RETRY_SECONDS
+        if status == 429:
+            self.rate_limited += 1
+            self.paused_until  = now + RATE_LIMIT_PAUSE
+            logger.warning("WeatherAPI rate limit hit; pausing prefetch for %ss", RATE_LIMIT_PAUSE)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def status(self) -> Dict[str, Any]:
+        def stamp(value: Optional[float]) -> Optional[str]:
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(value)) if value else None
+
+        due = dict(self._next_due)
+        return {
+            "enabled":          True,
+            "running":          self.running,
+            "role":             self.role,
+            "calls_per_minute": self.calls_per_minute,
+            "interval_seconds": round(self.interval, 2),
+            "upstream_calls":   self.upstream_calls,
+            "failures":         self.failures,
+            "rate_limited":     self.rate_limited,
+            "last_call_at":     stamp(self.last_call_at),
+            "last_item":        self.last_item,
+            "paused_until":     stamp(self.paused_until if self.paused_until > time.time() else None),
+            "next_due":         {item: stamp(at) or "now" for item, at in sorted(due.items(), key=lambda p: p[1])[:5]},
+        }
@@ -0,0 +1,131 @@
+"""
+services/weather_store.py
+Shared backend for the WeatherService cache, so gunicorn workers and
+serverless instances reuse one another's forecasts instead of each calling
+WeatherAPI. Payloads live in a `weather_cache` table (SQLite file, or the app
+database) with the time they were fetched; a per-key lease makes sure only
+one process refetches an expired entry while the others keep serving it.
+WEATHER_CACHE_BACKEND picks the backend:
+  memory - per-process cache only (default)
+  sqlite - a SQLite file at WEATHER_CACHE_SQLITE_PATH, shared by one host's workers
+  db     - the app database (wired up in app.py), shared by every instance
+Place this file at:  services/weather_store.py
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Safe import of SQLAlchemy Core (only needed for the shared backends)
+# ---------------------------------------------------------------------------
+try:
+    from sqlalchemy import (
+        Column, Float, MetaData, String, Table, Text, create_engine, delete, or_, select, update,
+    )
+    from sqlalchemy.exc import IntegrityError
+    _SQLALCHEMY_AVAILABLE = True
+except ModuleNotFoundError:
+    _SQLALCHEMY_AVAILABLE = False
+
+
+WEATHER_CACHE_BACKENDS = ("memory", "sqlite", "db")
+DEFAULT_SQLITE_PATH    = "/tmp/umuhuza_weather_cache.db"
+
+
+def get_weather_backend_from_env() -> str:
+    raw = (os.getenv("WEATHER_CACHE_BACKEND") or "").strip().lower()
+    return raw if raw in WEATHER_CACHE_BACKENDS else "memory"
+
+
+class SQLWeatherStore:
+    """Weather payloads and fetch leases in a `weather_cache` table."""
+
+    def __init__(self, engine) -> None:
+        if not _SQLALCHEMY_AVAILABLE:
+            raise RuntimeError("SQLAlchemy is required for the shared weather cache.")
+        self.engine   = engine
+        self.metadata = MetaData()
+        self.table    = Table(
+            "weather_cache", self.metadata,
+            Column("cache_key",   String(32), primary_key=True),
+            Column("payload",     Text,       nullable=True),
+            Column("stored_at",   Float,      nullable=False, default=0.0),
+            Column("lease_owner", String(64), nullable=True),
+            Column("lease_until", Float,      nullable=False, default=0.0),
+        )
+        self.metadata.create_all(engine, checkfirst=True)
+
+    @classmethod
+    def from_sqlite_path(cls, path: str) -> "SQLWeatherStore":
+        return cls(create_engine(f"sqlite:///{path}", connect_args={"timeout": 5}))
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(payload, stored_at) or None when nothing has been stored yet."""
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(self.table.c.payload, self.table.c.stored_at)
+                .where(self.table.c.cache_key == key)
+            ).first()
+        if row is None or not row.payload:
+            return None
+        return json.loads(row.payload), row.stored_at
+
+    def put(self, key: str, payload: Dict[str, Any], stored_at: float) -> None:
+        values = {"payload": json.dumps(payload), "stored_at": stored_at}
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                update(self.table).where(self.table.c.cache_key == key).values(**values)
+            ).rowcount
+            if not updated:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(self.table.insert().values(cache_key=key, **values))
+                except IntegrityError:
+                    # Another instance stored the same key concurrently
+                    pass
+
+    def acquire_lease(self, key: str, owner: str, seconds: float) -> bool:
+        """True when `owner` may fetch `key` for the next `seconds` (nobody else holds a live lease)."""
+        now = time.time()
+        with self.engine.begin() as conn:
+            acquired = conn.execute(
+                update(self.table)
+                .where(self.table.c.cache_key == key,
+                       or_(self.table.c.lease_until <= now, self.table.c.lease_owner == owner))
+                .values(lease_owner=owner, lease_until=now + seconds)
+            ).rowcount
+            if acquired:
+                return True
+            try:
+                with conn.begin_nested():
+                    conn.execute(self.table.insert().values(
+                        cache_key=key, payload=None, stored_at=0.0,
+                        lease_owner=owner, lease_until=now + seconds))
+                return True
+            except IntegrityError:
+                # The row exists and someone else's lease is still live
+                return False
+
+    def release_lease(self, key: str, owner: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(self.table)
+                .where(self.table.c.cache_key == key, self.table.c.lease_owner == owner)
+                .values(lease_owner=None, lease_until=0.0)
+            )
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table))
+
+
+def weather_store_from_env() -> Optional[SQLWeatherStore]:
+    """The sqlite backend, when configured; `db` needs the app engine and is set up in app.py."""
+    if get_weather_backend_from_env() != "sqlite" or not _SQLALCHEMY_AVAILABLE:
+        return None
+    try:
+        return SQLWeatherStore.from_sqlite_path(os.getenv("WEATHER_CACHE_SQLITE_PATH") or DEFAULT_SQLITE_PATH)
+    except Exception:
+        return None
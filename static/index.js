@@ -94,17 +94,90 @@ function escapeHtml(unsafeText) {
         }
     };
 
+    const createAssistantBubble = () => {
+        const wrapper = document.createElement('div');
+        wrapper.className = 'chatbot-message chatbot-message--assistant';
+        const bubble = document.createElement('div');
+        bubble.className = 'chatbot-message__bubble';
+        wrapper.appendChild(bubble);
+        messagesWrapper.appendChild(wrapper);
+        return (text) => {
+            bubble.innerHTML = escapeHtml(text).replace(/\n/g, '<br>');
+            messagesWrapper.scrollTop = messagesWrapper.scrollHeight;
+        };
+    };
+
+    const canStream = typeof window.ReadableStream === 'function' && typeof window.TextDecoder === 'function';
+
+    // Streams /chat/stream (Server-Sent Events) so the first words show up immediately.
+    const streamFromAssistant = async (body) => {
+        const response = await fetch('/chat/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+            body: JSON.stringify(body)
+        });
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!response.ok || !contentType.includes('text/event-stream') || !response.body) {
+            const payload = await response.json().catch(() => ({}));
+            appendMessage('assistant', payload.error || 'The assistant is unavailable right now.');
+            return;
+        }
+
+        const render = createAssistantBubble();
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let reply = '';
+        let failed = false;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            frames.forEach((frame) => {
+                const isError = frame.startsWith('event: error');
+                const dataLine = frame.split('\n').find((line) => line.startsWith('data: '));
+                if (!dataLine) {
+                    return;
+                }
+                const data = JSON.parse(dataLine.slice(6));
+                if (isError) {
+                    failed = true;
+                    reply = data.error || 'The assistant is unavailable right now.';
+                } else if (data.delta) {
+                    reply += data.delta;
+                }
+                render(reply);
+            });
+        }
+
+        if (reply && !failed) {
+            state.history.push({ role: 'assistant', content: reply });
+        }
+    };
+
     const sendToAssistant = async (latestUserMessage) => {
         const trimmedHistory = state.history.slice(-8);
         const historyForServer = trimmedHistory.slice(0, -1);
+        const body = {
+            message: latestUserMessage,
+            history: historyForServer
+        };
         try {
+            if (canStream) {
+                await streamFromAssistant(body);
+                return;
+            }
+
             const response = await fetch('/chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    message: latestUserMessage,
-                    history: historyForServer
-                })
+                body: JSON.stringify(body)
             });
 
             const payload = await response.json();
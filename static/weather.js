@@ -28,32 +28,44 @@
 
   const ENDPOINT = '/api/weather';
   const CACHE_WINDOW = 60 * 1000;
-  let cache = null;
-  let cacheTimestamp = 0;
-  let inflight = null;
+  // Keyed by endpoint: widgets with data-districts only fetch their own districts
+  const cache = new Map();
+  const inflight = new Map();
 
   const getString = (widget, key, fallback) => widget.dataset[key] || fallback;
 
-  const fetchWeather = async (force = false, strings) => {
-    if (!force && cache && (Date.now() - cacheTimestamp) < CACHE_WINDOW) {
-      return cache;
+  // The widget only renders districts, so skip the forecast, alerts and AQI
+  const FIELDS = 'fields=districts,districts_error';
+
+  const endpointFor = (widget) => {
+    const districts = (widget.dataset.districts || '').trim();
+    return districts
+      ? `${ENDPOINT}?districts=${encodeURIComponent(districts)}&${FIELDS}`
+      : `${ENDPOINT}?${FIELDS}`;
+  };
+
+  const fetchWeather = async (endpoint, force = false, strings) => {
+    const cached = cache.get(endpoint);
+    if (!force && cached && (Date.now() - cached.timestamp) < CACHE_WINDOW) {
+      return cached.data;
     }
-    if (!force && inflight) {
-      return inflight;
+    if (!force && inflight.has(endpoint)) {
+      return inflight.get(endpoint);
     }
-    const url = force ? `${ENDPOINT}?refresh=1` : ENDPOINT;
-    inflight = fetch(url)
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const url = force ? `${endpoint}${separator}refresh=1` : endpoint;
+    const request = fetch(url)
       .then((res) => res.json())
       .then((data) => {
-        cache = data;
-        cacheTimestamp = Date.now();
+        cache.set(endpoint, { data, timestamp: Date.now() });
         return data;
       })
       .catch(() => ({ error: (strings && strings.errorGeneric) || 'Unable to load weather data.' }))
       .finally(() => {
-        inflight = null;
+        inflight.delete(endpoint);
       });
-    return inflight;
+    inflight.set(endpoint, request);
+    return request;
   };
 
   const buildDistrictCardsHtml = (districts = [], errorMessage, strings = {}) => {
@@ -117,7 +129,7 @@
   };
 
   const refreshWidget = async (widget, strings, force = false) => {
-    const data = await fetchWeather(force, strings);
+    const data = await fetchWeather(endpointFor(widget), force, strings);
     updateWidget(widget, data, strings);
   };
 
@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+# Make the project root importable when run as plain `pytest`
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# app.py configures itself at import time: point it at a throwaway SQLite file
+# and keep background work off before anything imports it
+_TMP_DIR = tempfile.mkdtemp(prefix="umuhuza-tests-")
+os.environ.pop("DATABASE_URL", None)
+os.environ.pop("DB_PROXY_URL", None)
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_TMP_DIR}/app.db"
+os.environ["DB_POOL_MODE"]            = "null"
+os.environ["WEATHER_PREFETCH"]        = "false"
+os.environ["WEATHER_CACHE_BACKEND"]   = "memory"
+os.environ["EXPORT_JOB_DIR"]          = f"{_TMP_DIR}/exports"
+
+
+@pytest.fixture
+def flask_app():
+    """The app module with empty tables and caches for each test."""
+    import app as app_module
+
+    app_module.app.config.update(TESTING=True)
+    with app_module.app.app_context():
+        app_module.db.drop_all()
+        app_module.db.create_all()
+    app_module.dashboard_cache.invalidate()
+    yield app_module
+    with app_module.app.app_context():
+        app_module.db.session.remove()
+
+
+@pytest.fixture
+def make_user(flask_app):
+    def make(role, name=None):
+        with flask_app.app.app_context():
+            user = flask_app.User(full_name=name or role.capitalize(), email=f"{role}-{os.urandom(4).hex()}@example.com",
+                                  role=role)
+            user.set_password("password")
+            flask_app.db.session.add(user)
+            flask_app.db.session.commit()
+            return user.id
+    return make
+
+
+@pytest.fixture
+def client_for(flask_app):
+    """A test client logged in as the given user id."""
+    def login(user_id):
+        client = flask_app.app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"]   = True
+        return client
+    return login
+
+
+class FakeWeatherResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body       = body or {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} from fake WeatherAPI", response=self)
+
+
+class FakeWeatherSession:
+    """Stands in for WeatherService's requests.Session: counts calls per (endpoint, location)."""
+
+    def __init__(self, clock=time.time):
+        self.clock  = clock
+        self.calls  = []
+        self.times  = []
+        self.status = {}     # location name (or "*") -> HTTP status to answer with
+
+    def count(self, endpoint=None, name=None):
+        return sum(1 for e, n in self.calls if endpoint in (None, e) and name in (None, n))
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        name     = (params or {}).get("q", "").split(",")[0]
+        self.calls.append((endpoint, name))
+        self.times.append(self.clock())
+        status = self.status.get(name, self.status.get("*", 200))
+        if status != 200:
+            return FakeWeatherResponse(status)
+        current = {"temp_c": 20.0, "humidity": 60, "last_updated": "2024-01-01 12:00",
+                   "condition": {"text": "Sunny", "icon": "//cdn.example/113.png"}}
+        body = {"location": {"name": name}, "current": current}
+        if endpoint == "forecast.json":
+            body["forecast"] = {"forecastday": []}
+        return FakeWeatherResponse(200, body)
+
+
+@pytest.fixture
+def weather_session_factory():
+    return FakeWeatherSession
+
+
+@pytest.fixture
+def weather_upstream(flask_app):
+    """The app's WeatherService with an empty cache, talking to a FakeWeatherSession."""
+    service = flask_app.weather_service
+    fake    = FakeWeatherSession()
+    service.invalidate()
+    previous, service._http = service._http, fake
+    yield fake
+    # Let a background refresh started by the test finish against the fake
+    deadline = time.monotonic() + 10
+    while service._refresh_done is not None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    service._http = previous
+    service.invalidate()
@@ -0,0 +1,44 @@
+"""Semantic answer cache: near-duplicates may share answers, different questions must not."""
+
+import pytest
+
+from services.chat_cache import SemanticAnswerCache, semantic_scope
+
+SCOPE = semantic_scope("llama-3.1-8b-instant", 0.4, [3, 1, 2])
+
+# Questions that differ in the one word that matters
+DIFFERENT_QUESTIONS = [
+    ("How do I register as a farmer?", "How do I register as a dealer?"),
+    ("register as a farmer", "register as a dealer"),
+    ("What is the maize price in Musanze?", "What is the maize price in Huye?"),
+    ("maize price in Musanze", "maize price in Huye"),
+    ("What is the price of maize today?", "What is the price of rice today?"),
+    ("price of maize today", "price of rice today"),
+]
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(capacity=16)
+
+
+@pytest.mark.parametrize("stored, asked", DIFFERENT_QUESTIONS)
+def test_different_questions_miss_even_with_the_same_grounding(cache, stored, asked):
+    cache.store(cache.embed(stored), SCOPE, f"answer to {stored}")
+    assert cache.lookup(cache.embed(asked), SCOPE) is None
+
+
+def test_same_question_reworded_punctuation_hits(cache):
+    cache.store(cache.embed("How do I register as a farmer?"), SCOPE, "Use the sign-up page.")
+    assert cache.lookup(cache.embed("how do i register as a farmer!!"), SCOPE) == "Use the sign-up page."
+
+
+def test_different_retrieved_chunks_miss(cache):
+    question = "How do I register as a farmer?"
+    cache.store(cache.embed(question), SCOPE, "Use the sign-up page.")
+    other = semantic_scope("llama-3.1-8b-instant", 0.4, [1, 2, 4])
+    assert cache.lookup(cache.embed(question), other) is None
+
+
+def test_scope_ignores_chunk_order():
+    assert semantic_scope("m", 0.4, [2, 1]) == semantic_scope("m", 0.4, [1, 2])
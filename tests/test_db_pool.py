@@ -0,0 +1,114 @@
+"""Pool options per DB_POOL_MODE and environment, and the PoolStats counters."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from services.db_pool import (
+    SERVER_POOL_DEFAULTS,
+    SERVERLESS_POOL_DEFAULTS,
+    PoolStats,
+    get_pool_mode_from_env,
+    pool_options_from_env,
+    proxy_url_from_env,
+)
+
+POOL_ENV = ("DB_POOL_MODE", "DB_POOL_SIZE", "DB_POOL_MAX_OVERFLOW", "DB_POOL_RECYCLE",
+            "DB_POOL_TIMEOUT", "DB_PROXY_URL", "VERCEL", "AWS_LAMBDA_FUNCTION_NAME")
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in POOL_ENV:
+        monkeypatch.delenv(name, raising=False)
+
+
+def expected_queue(defaults):
+    return {"poolclass": QueuePool, "pool_size": defaults["size"],
+            "max_overflow": defaults["max_overflow"], "pool_recycle": defaults["recycle"],
+            "pool_timeout": defaults["timeout"], "pool_pre_ping": True}
+
+
+def test_queue_is_the_default_mode(monkeypatch):
+    assert get_pool_mode_from_env() == "queue"
+    monkeypatch.setenv("DB_POOL_MODE", "bogus")
+    assert get_pool_mode_from_env() == "queue"
+
+
+def test_queue_on_a_server():
+    assert pool_options_from_env() == expected_queue(SERVER_POOL_DEFAULTS)
+
+
+@pytest.mark.parametrize("marker", ["VERCEL", "AWS_LAMBDA_FUNCTION_NAME"])
+def test_queue_on_serverless(monkeypatch, marker):
+    monkeypatch.setenv(marker, "1")
+    assert pool_options_from_env() == expected_queue(SERVERLESS_POOL_DEFAULTS)
+
+
+def test_queue_env_overrides(monkeypatch):
+    monkeypatch.setenv("VERCEL", "1")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "not-a-number")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "-5")
+    options = pool_options_from_env()
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 0
+    assert options["pool_recycle"] == SERVERLESS_POOL_DEFAULTS["recycle"]
+    assert options["pool_timeout"] == SERVERLESS_POOL_DEFAULTS["timeout"]
+
+
+def test_pool_size_is_at_least_one(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "0")
+    assert pool_options_from_env()["pool_size"] == 1
+
+
+@pytest.mark.parametrize("mode", ["null", "proxy"])
+@pytest.mark.parametrize("serverless", [False, True])
+def test_null_and_proxy_use_nullpool(monkeypatch, mode, serverless):
+    monkeypatch.setenv("DB_POOL_MODE", mode)
+    if serverless:
+        monkeypatch.setenv("VERCEL", "1")
+    assert pool_options_from_env() == {"poolclass": NullPool}
+
+
+def test_proxy_url_only_in_proxy_mode(monkeypatch):
+    monkeypatch.setenv("DB_PROXY_URL", "mysql://proxy.internal/umuhuza")
+    assert proxy_url_from_env() is None
+    monkeypatch.setenv("DB_POOL_MODE", "proxy")
+    assert proxy_url_from_env() == "mysql://proxy.internal/umuhuza"
+
+
+def test_pool_stats_count_checkouts_and_checkins(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", **pool_options_from_env("queue"))
+    stats  = PoolStats().attach(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert (stats.checkouts, stats.checkins) == (1, 0)
+        assert stats.snapshot(engine)["checked_out"] == 1
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    snapshot = stats.snapshot(engine)
+    assert snapshot["pool_class"] == "QueuePool"
+    assert (snapshot["connects"], snapshot["checkouts"], snapshot["checkins"]) == (1, 2, 2)
+    assert snapshot["reuse_rate"] == 0.5
+    assert snapshot["checked_out"] == 0 and snapshot["checked_in"] == 1
+
+    with engine.connect() as conn:
+        conn.invalidate()
+    assert stats.snapshot(engine)["invalidations"] == 1
+    engine.dispose()
+
+
+def test_pool_stats_with_nullpool_connects_every_time(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=NullPool)
+    stats  = PoolStats().attach(engine)
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    snapshot = stats.snapshot(engine)
+    assert (snapshot["connects"], snapshot["checkouts"], snapshot["checkins"]) == (3, 3, 3)
+    assert snapshot["reuse_rate"] == 0.0
+    assert "checked_out" not in snapshot
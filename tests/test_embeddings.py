@@ -0,0 +1,114 @@
+"""Stored embedding codecs (JSON and binary) and the knowledge index built from them."""
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from services.embeddings import (
+    BINARY_HEADER,
+    SparseVector,
+    decode_embedding,
+    decode_embedding_binary,
+    dense_to_sparse,
+    encode_embedding,
+    encode_embedding_binary,
+    hash_embed,
+)
+from services.knowledge_index import KnowledgeIndex
+
+DIM = 64
+
+
+@pytest.fixture
+def kb_session():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE knowledge_base (id INTEGER PRIMARY KEY, content TEXT, embedding BLOB)"))
+    with Session(engine) as session:
+        yield session
+
+
+def add_rows(session, rows):
+    for chunk_id, content, embedding in rows:
+        session.execute(text("INSERT INTO knowledge_base (id, content, embedding) VALUES (:i, :c, :e)"),
+                        {"i": chunk_id, "c": content, "e": embedding})
+    session.commit()
+
+
+def build(session):
+    return KnowledgeIndex(source="db")._build(session, DIM, (0, 0, 0, 0))
+
+
+def test_undecodable_bytes_decode_to_none():
+    assert decode_embedding(b"\xff\xfe\x00not utf-8") is None
+
+
+def test_undecodable_row_is_skipped(kb_session):
+    add_rows(kb_session, [
+        (1, "maize planting season", encode_embedding("maize planting season", DIM, "dense").encode()),
+        (2, "broken row",            b"\xff\xfe\x00not utf-8"),
+        (3, "rice irrigation",       encode_embedding("rice irrigation", DIM, "sparse").encode()),
+    ])
+    snapshot = build(kb_session)
+    assert snapshot.ids == [1, 3]
+    assert snapshot.matrix.shape == (2, DIM)
+
+
+# ---------------------------------------------------------------------------
+# Binary storage format
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 0), ("float16", 1e-3)])
+def test_dense_binary_round_trip(dtype, tolerance):
+    vector  = hash_embed("maize rust treatment", DIM)
+    decoded = decode_embedding(encode_embedding_binary(vector, dtype))
+    assert decoded.dtype == np.dtype(dtype) and decoded.shape == (DIM,)
+    np.testing.assert_allclose(decoded.astype(np.float32), vector, atol=tolerance)
+
+
+def test_sparse_binary_round_trip():
+    sparse  = dense_to_sparse(hash_embed("maize rust treatment", DIM))
+    decoded = decode_embedding(encode_embedding_binary(sparse))
+    assert isinstance(decoded, SparseVector)
+    assert decoded.dim == DIM
+    np.testing.assert_array_equal(decoded.indices, sparse.indices)
+    np.testing.assert_allclose(decoded.weights, sparse.weights)
+
+
+def test_binary_decode_is_zero_copy():
+    payload = encode_embedding_binary(hash_embed("rice", DIM))
+    decoded = decode_embedding_binary(payload)
+    assert not decoded.flags.writeable
+    assert np.shares_memory(decoded, np.frombuffer(payload, dtype=np.uint8))
+
+
+@pytest.mark.parametrize("payload", [
+    encode_embedding_binary(hash_embed("maize", DIM))[:BINARY_HEADER.size - 1],      # short header
+    encode_embedding_binary(hash_embed("maize", DIM))[:-4],                          # short dense body
+    encode_embedding_binary(dense_to_sparse(hash_embed("maize", DIM)))[:-2],         # short sparse body
+    b"XXXX" + encode_embedding_binary(hash_embed("maize", DIM))[4:],                 # bad magic
+    BINARY_HEADER.pack(b"IKEB", 9, 2, DIM, DIM) + bytes(4 * DIM),                    # unknown version
+    BINARY_HEADER.pack(b"IKEB", 1, 7, DIM, DIM) + bytes(4 * DIM),                    # unknown kind
+    BINARY_HEADER.pack(b"IKEB", 1, 3, DIM, 1) + np.array([DIM], "<u4").tobytes()
+    + np.array([1.0], "<f4").tobytes(),                                              # index >= dim
+])
+def test_bad_binary_payloads_decode_to_none(payload):
+    assert decode_embedding(payload) is None
+
+
+def test_build_over_json_and_binary_rows(kb_session):
+    texts = ["maize planting", "rice irrigation", "coffee pruning", "bean storage", "banana wilt"]
+    add_rows(kb_session, [
+        (1, texts[0], encode_embedding(texts[0], DIM, "dense")),
+        (2, texts[1], encode_embedding(texts[1], DIM, "sparse")),
+        (3, texts[2], encode_embedding(texts[2], DIM, "binary32")),
+        (4, texts[3], encode_embedding(texts[3], DIM, "binary16")),
+        (5, texts[4], encode_embedding(texts[4], DIM, "binary-sparse")),
+        (6, "wrong size", encode_embedding("wrong size", DIM * 2, "binary32")),
+    ])
+    snapshot = build(kb_session)
+    assert snapshot.ids == [1, 2, 3, 4, 5]
+    for row, text_ in enumerate(texts):
+        expected = hash_embed(text_, DIM)
+        expected = expected / np.linalg.norm(expected)
+        np.testing.assert_allclose(snapshot.matrix[row], expected, atol=1e-3)
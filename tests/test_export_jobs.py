@@ -0,0 +1,117 @@
+"""User exports: job status, download ownership, inline streaming and stale jobs."""
+
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from services.export_jobs import FAILED, QUEUED, RUNNING, STALE_ERROR, ExportJobManager
+
+JSON = {"Accept": "application/json"}
+
+
+def job_record(manager, owner_id, status, **fields):
+    job = {"id": uuid.uuid4().hex, "owner_id": owner_id, "filetype": "excel", "title": "Farmer Users",
+           "filename": "farmer_users.xlsx", "status": status, "rows": None, "error": None,
+           "created_at": time.time(), "finished_at": None, "host": manager.host,
+           "pid": os.getpid(), "heartbeat": time.time()}
+    job.update(fields)
+    os.makedirs(manager.directory, exist_ok=True)
+    manager._save(job)
+    return job
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def policy(flask_app, make_user, client_for):
+    make_user("farmer", "Farmer One")
+    make_user("farmer", "Farmer Two")
+    owner = make_user("policy", "Owner")
+    other = make_user("policy", "Other")
+    return {"owner": owner, "client": client_for(owner), "other": client_for(other)}
+
+
+def wait_done(client, status_url, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(status_url, headers=JSON).get_json()
+        if data["status"] not in (QUEUED, RUNNING):
+            return data
+        time.sleep(0.05)
+    raise AssertionError("export did not finish")
+
+
+def test_background_export_status_and_download(flask_app, policy):
+    response = policy["client"].get("/export/farmer/excel", headers=JSON)
+    assert response.status_code == 202
+    data = wait_done(policy["client"], response.get_json()["status_url"])
+    assert data["status"] == "done" and data["rows"] == 2
+
+    download = policy["client"].get(data["download_url"])
+    assert download.status_code == 200
+    assert download.data[:2] == b"PK"    # xlsx is a zip
+    assert 'filename=farmer_users.xlsx' in download.headers["Content-Disposition"]
+
+
+def test_jobs_are_private_to_their_owner(flask_app, policy):
+    response = policy["client"].get("/export/farmer/excel", headers=JSON)
+    data     = wait_done(policy["client"], response.get_json()["status_url"])
+    assert policy["other"].get(data["status_url"], headers=JSON).status_code == 404
+    assert policy["other"].get(data["download_url"], headers=JSON).status_code == 404
+    assert policy["client"].get("/export/jobs/not-a-job-id", headers=JSON).status_code == 404
+
+
+def test_download_is_409_until_done(flask_app, policy):
+    job = job_record(flask_app.export_jobs, policy["owner"], RUNNING)
+    response = policy["client"].get(f"/export/jobs/{job['id']}/download", headers=JSON)
+    assert response.status_code == 409
+    assert response.get_json()["status"] == RUNNING
+
+
+def test_only_policy_users_export(flask_app, make_user, client_for):
+    farmer = client_for(make_user("farmer"))
+    assert farmer.get("/export/farmer/excel", headers=JSON).status_code == 403
+
+
+def test_inline_export_streams_the_file(flask_app, policy, monkeypatch):
+    monkeypatch.setattr(flask_app.export_jobs, "workers", 0)
+    os.makedirs(flask_app.export_jobs.directory, exist_ok=True)
+    before   = set(os.listdir(flask_app.export_jobs.directory))
+    response = policy["client"].get("/export/farmer/excel", headers=JSON)
+    assert response.status_code == 200
+    assert response.data[:2] == b"PK"
+    response.close()
+    # Sent and gone: nothing left behind in this instance's /tmp
+    assert set(os.listdir(flask_app.export_jobs.directory)) == before
+
+
+def test_dead_worker_job_is_failed(tmp_path):
+    manager = ExportJobManager(directory=str(tmp_path), workers=1, stale_after=60)
+    job     = job_record(manager, 1, RUNNING, pid=dead_pid())
+    assert manager.get(job["id"])["status"] == FAILED
+    assert manager.get(job["id"])["error"] == STALE_ERROR
+    assert manager._find_active(1, "excel", "Farmer Users") is None
+
+
+def test_silent_heartbeat_is_failed(tmp_path):
+    manager = ExportJobManager(directory=str(tmp_path), workers=1, stale_after=60)
+    quiet   = job_record(manager, 1, RUNNING, heartbeat=time.time() - 120)
+    queued  = job_record(manager, 1, QUEUED, host="elsewhere", pid=1, created_at=time.time() - 120,
+                         heartbeat=None)
+    assert manager.get(quiet["id"])["status"] == FAILED
+    assert manager.get(queued["id"])["status"] == FAILED
+
+
+def test_live_job_is_left_alone(tmp_path):
+    manager = ExportJobManager(directory=str(tmp_path), workers=1, stale_after=60)
+    job     = job_record(manager, 1, RUNNING)
+    assert manager.get(job["id"])["status"] == RUNNING
+    assert manager._find_active(1, "excel", "Farmer Users")["id"] == job["id"]
@@ -0,0 +1,64 @@
+"""Dashboard section fan-out: per-request isolation and detached-safe section results."""
+
+import threading
+import time
+
+from services.fanout import SectionLoader
+
+
+def test_slow_sections_in_other_requests_do_not_starve_this_one(flask_app, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_FANOUT_WORKERS", "2")
+    release = threading.Event()
+    blocked = []
+
+    def slow_request():
+        loader = SectionLoader(flask_app.app, timeout=5)
+        loader.add("weather", lambda: release.wait(5), default=None)
+        loader.add("weather_again", lambda: release.wait(5), default=None)
+        blocked.append(loader.run())
+
+    # Enough slow requests to fill any shared pool several times over
+    threads = [threading.Thread(target=slow_request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+
+    loader = SectionLoader(flask_app.app, timeout=1)
+    loader.add("orders", lambda: "orders", default="timed out")
+    loader.add("prices", lambda: "prices", default="timed out")
+    started = time.monotonic()
+    assert loader.run() == {"orders": "orders", "prices": "prices"}
+    assert time.monotonic() - started < 0.5
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_section_timeout_falls_back_to_default(flask_app, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_FANOUT_WORKERS", "2")
+    release = threading.Event()
+    loader  = SectionLoader(flask_app.app)
+    loader.add("slow", lambda: release.wait(5), default="fallback", timeout=0.1)
+    loader.add("fast", lambda: "ok", default=None)
+    assert loader.run() == {"slow": "fallback", "fast": "ok"}
+    release.set()
+
+
+def test_farmer_dashboard_renders_orders_loaded_in_a_section(flask_app, make_user, client_for, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_FANOUT_WORKERS", "4")
+    farmer = make_user("farmer")
+    dealer = make_user("dealer")
+    with flask_app.app.app_context():
+        flask_app.db.session.add(flask_app.Order(farmer_id=farmer, dealer_id=dealer, product_name="Urea",
+                                                 quantity=3, unit="kg", status="pending"))
+        flask_app.db.session.commit()
+    monkeypatch.setattr(flask_app, "localized_weather_snapshot", lambda wait=None: {"error": "offline"})
+
+    client = client_for(farmer)
+    page   = client.get("/dashboard")
+    assert page.status_code == 200
+    assert b"Urea" in page.data
+
+    body = client.get("/dashboard", headers={"Accept": "application/json"}).get_json()
+    assert [(o["product_name"], o["quantity"]) for o in body["my_orders"]] == [("Urea", 3)]
@@ -0,0 +1,65 @@
+"""Every inventory write must drop the cached farmer-facing catalog."""
+
+import pytest
+
+JSON = {"Accept": "application/json"}
+
+
+@pytest.fixture
+def shop(flask_app, make_user):
+    dealer = make_user("dealer", "Dealer One")
+    farmer = make_user("farmer")
+    with flask_app.app.app_context():
+        inv   = flask_app.Inventory(dealer_id=dealer, product_name="Urea", stock=100, unit="kg")
+        order = flask_app.Order(farmer_id=farmer, dealer_id=dealer, product_name="Urea",
+                                quantity=10, unit="kg", status="pending")
+        flask_app.db.session.add_all([inv, order])
+        flask_app.db.session.commit()
+        return {"dealer": dealer, "farmer": farmer, "inv": inv.id, "order": order.id}
+
+
+def catalog(flask_app):
+    with flask_app.app.app_context():
+        return {row["product_name"]: row for row in flask_app.inventory_catalog()}
+
+
+def test_catalog_is_cached_between_reads(flask_app, shop):
+    assert catalog(flask_app)["Urea"]["stock"] == 100
+    with flask_app.app.app_context():
+        flask_app.Inventory.query.get(shop["inv"]).stock = 1
+        flask_app.db.session.commit()
+    # Written behind the app's back: still the cached value
+    assert catalog(flask_app)["Urea"]["stock"] == 100
+
+
+@pytest.mark.parametrize("route, body, expected", [
+    ("/dealer/inventory/{inv}/update",       {"stock": 55},                          {"Urea": 55}),
+    ("/dealer/order/{order}/action",         {"action": "approve"},                  {"Urea": 90}),
+    ("/api/dealer-orders/{order}/action",    {"action": "approve"},                  {"Urea": 90}),
+    ("/api/inventory/update-stock",          {"inv_id": "{inv}", "quantity_reduction": 7}, {"Urea": 93}),
+    ("/dealer/inventory/create",             {"product_name": "DAP", "stock": 20},   {"Urea": 100, "DAP": 20}),
+])
+def test_inventory_writes_invalidate_catalog(flask_app, client_for, shop, route, body, expected):
+    catalog(flask_app)  # prime the cache
+    body = {key: int(value.format(**shop)) if isinstance(value, str) and "{" in value else value
+            for key, value in body.items()}
+    response = client_for(shop["dealer"]).post(route.format(**shop), json=body, headers=JSON)
+    assert response.status_code in (200, 201), response.get_data(as_text=True)
+    current = catalog(flask_app)
+    assert {name: current[name]["stock"] for name in expected} == expected
+
+
+def test_rejecting_an_approved_order_restocks_the_catalog(flask_app, client_for, shop):
+    client = client_for(shop["dealer"])
+    client.post(f"/api/dealer-orders/{shop['order']}/action", json={"action": "approve"}, headers=JSON)
+    assert catalog(flask_app)["Urea"]["stock"] == 90
+    client.post(f"/api/dealer-orders/{shop['order']}/action", json={"action": "reject"}, headers=JSON)
+    assert catalog(flask_app)["Urea"]["stock"] == 100
+
+
+def test_dealer_profile_update_refreshes_catalog_contact(flask_app, client_for, shop):
+    assert catalog(flask_app)["Urea"]["dealer_name"] == "Dealer One"
+    response = client_for(shop["dealer"]).post(
+        "/profile/update", json={"full_name": "Dealer Renamed", "phone": "0788000111"}, headers=JSON)
+    assert response.status_code == 200
+    assert catalog(flask_app)["Urea"]["dealer_name"] == "Dealer Renamed"
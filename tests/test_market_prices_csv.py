@@ -0,0 +1,43 @@
+"""CSV export of market prices: commodity filter and the emptiness probe."""
+
+import csv
+from datetime import date
+from io import StringIO
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+
+@pytest.fixture
+def researcher(flask_app, make_user, client_for):
+    with flask_app.app.app_context():
+        flask_app.db.session.add_all([
+            flask_app.MarketPrice(commodity="Maize", price=400, province="East", unit="kg", date=date(2024, 3, 1)),
+            flask_app.MarketPrice(commodity="MAIZE", price=410, province="West", unit="kg", date=date(2024, 3, 2)),
+            flask_app.MarketPrice(commodity="Rice",  price=900, province="East", unit="kg", date=date(2024, 3, 1)),
+        ])
+        flask_app.db.session.commit()
+    return client_for(make_user("researcher"))
+
+
+def commodities(response):
+    rows = list(csv.reader(StringIO(response.get_data(as_text=True))))
+    return sorted(row[1] for row in rows[1:])
+
+
+@pytest.mark.parametrize("value", ["maize", "Maize", "MAIZE", " mAiZe "])
+def test_commodity_filter_ignores_case(researcher, value):
+    response = researcher.get("/download_market_prices", query_string={"commodity": value})
+    assert response.status_code == 200
+    assert commodities(response) == ["MAIZE", "Maize"]
+
+
+def test_unknown_commodity_is_404(researcher):
+    assert researcher.get("/download_market_prices?commodity=beans").status_code == 404
+
+
+def test_probe_errors_are_not_reported_as_empty(flask_app, researcher):
+    with flask_app.app.app_context():
+        flask_app.MarketPrice.__table__.drop(flask_app.db.engine)
+    with pytest.raises(OperationalError):
+        researcher.get("/download_market_prices")
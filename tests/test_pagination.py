@@ -0,0 +1,156 @@
+"""Keyset pagination: every row exactly once, in order, across ties and NULL sort keys."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, declarative_base
+
+from services.pagination import InvalidCursor, _ordering, keyset_page
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id         = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # 3 rows per timestamp (ties), with NULL timestamps mixed in
+        for i in range(1, 31):
+            created_at = None if i % 7 == 0 else START + timedelta(minutes=i // 3)
+            session.add(Row(id=i, created_at=created_at))
+        session.commit()
+        yield session
+
+
+def _walk(session, keys, limit):
+    seen, after, pages = [], None, 0
+    while True:
+        rows, after = keyset_page(session.query(Row), keys, limit, after)
+        seen.extend(rows)
+        pages += 1
+        assert pages < 100, "pagination did not terminate"
+        if after is None:
+            return seen
+
+
+def _expected(session, descending):
+    # NULL sorts below every value
+    rows = session.query(Row).all()
+    def key(row):
+        stamp = row.created_at.timestamp() if row.created_at else float("-inf")
+        return (stamp, row.id)
+    return sorted(rows, key=key, reverse=descending)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7, 50])
+@pytest.mark.parametrize("descending", [True, False])
+def test_walk_returns_every_row_once_in_order(session, limit, descending):
+    keys = [(Row.created_at, descending), (Row.id, descending)]
+    seen = _walk(session, keys, limit)
+    assert [row.id for row in seen] == [row.id for row in _expected(session, descending)]
+
+
+def test_cursor_taken_on_a_null_key_continues_with_the_remaining_nulls(session):
+    keys  = [(Row.created_at, True), (Row.id, True)]
+    first = session.query(Row).filter(Row.created_at.isnot(None)).count() + 1
+    rows, after = keyset_page(session.query(Row), keys, first)
+    assert rows[-1].created_at is None
+    rest, _ = keyset_page(session.query(Row), keys, 50, after)
+    assert [row.id for row in rest] == [21, 14, 7]
+
+
+def test_last_page_has_no_cursor(session):
+    rows, after = keyset_page(session.query(Row), [(Row.id, True)], 30)
+    assert len(rows) == 30 and after is None
+
+
+def test_bad_cursor_is_rejected(session):
+    with pytest.raises(InvalidCursor):
+        keyset_page(session.query(Row), [(Row.created_at, True), (Row.id, True)], 5, "not-a-cursor")
+
+
+def test_other_backends_get_explicit_null_ordering():
+    ordering = _ordering([(Row.created_at, True), (Row.id, True)], "postgresql")
+    sql      = [str(term.compile(dialect=postgresql.dialect())) for term in ordering]
+    assert sql == ["rows.created_at DESC NULLS LAST", "rows.id DESC"]
+
+
+def test_no_limit_returns_every_row_in_order(session):
+    rows, after = keyset_page(session.query(Row), [(Row.created_at, True), (Row.id, True)], None)
+    assert after is None
+    assert [r.id for r in rows] == [r.id for r in _expected(session, True)]
+
+
+# ---------------------------------------------------------------------------
+# JSON endpoints: unpaged callers keep the full array, paging is opt-in
+# ---------------------------------------------------------------------------
+JSON = {"Accept": "application/json"}
+
+
+@pytest.fixture
+def dealer_with_orders(flask_app, make_user, client_for):
+    dealer = make_user("dealer")
+    farmer = make_user("farmer")
+    with flask_app.app.app_context():
+        flask_app.db.session.add_all([
+            flask_app.Order(farmer_id=farmer, dealer_id=dealer, product_name=f"Item {i}", quantity=1,
+                            unit="kg", status="pending", created_at=START + timedelta(minutes=i // 2))
+            for i in range(75)
+        ])
+        flask_app.db.session.commit()
+    return client_for(dealer)
+
+
+def test_dealer_orders_unpaged_is_the_full_array(dealer_with_orders):
+    response = dealer_with_orders.get("/api/dealer-orders")
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list) and len(response.get_json()) == 75
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_dealer_orders_paged_envelope(dealer_with_orders):
+    seen, url = [], "/api/dealer-orders?limit=20"
+    while url:
+        body = dealer_with_orders.get(url).get_json()
+        assert set(body) == {"items", "next_cursor"}
+        seen.extend(order["id"] for order in body["items"])
+        url = f"/api/dealer-orders?limit=20&after={body['next_cursor']}" if body["next_cursor"] else None
+    assert len(seen) == len(set(seen)) == 75
+
+
+def test_user_list_json_opt_in(flask_app, make_user, client_for):
+    with flask_app.app.app_context():
+        flask_app.db.session.add_all([
+            flask_app.User(full_name=f"Farmer {i}", role="farmer", password_hash="-") for i in range(60)
+        ])
+        flask_app.db.session.commit()
+    policy = client_for(make_user("policy"))
+    assert len(policy.get("/users/farmer", headers=JSON).get_json()) == 60
+    body = policy.get("/users/farmer?limit=25", headers=JSON).get_json()
+    assert len(body["items"]) == 25 and body["next_cursor"]
+
+
+def test_dashboard_json_unpaged_has_every_price(flask_app, make_user, client_for):
+    with flask_app.app.app_context():
+        flask_app.db.session.add_all([
+            flask_app.MarketPrice(commodity="Maize", price=100 + i, date=(START + timedelta(days=i)).date())
+            for i in range(70)
+        ])
+        flask_app.db.session.commit()
+    farmer = client_for(make_user("farmer"))
+    body   = farmer.get("/dashboard", headers=JSON).get_json()
+    assert len(body["market_prices"]) == 70 and body["next_cursor"] is None
+    paged = farmer.get("/dashboard?limit=30", headers=JSON).get_json()
+    assert len(paged["market_prices"]) == 30 and paged["next_cursor"]
@@ -0,0 +1,72 @@
+"""Per-district weather: one cache entry and one upstream call per district."""
+
+import pytest
+
+JSON = {"Accept": "application/json"}
+
+
+def test_single_district_fetches_only_that_district(flask_app, weather_upstream):
+    service = flask_app.weather_service
+    result  = service.get_districts(["musanze"])
+    assert [d["name"] for d in result["districts"]] == ["Musanze"]
+    assert weather_upstream.calls == [("current.json", "Musanze")]
+
+    service.get_districts(["Musanze"])
+    assert weather_upstream.count() == 1
+
+
+def test_batch_fetches_each_named_district_once(flask_app, weather_upstream):
+    client   = flask_app.app.test_client()
+    response = client.get("/api/weather?districts=Musanze,Huye,musanze,Atlantis")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [d["name"] for d in body["districts"]] == ["Musanze", "Huye"]
+    assert body["unknown"] == ["Atlantis"]
+    assert weather_upstream.count("current.json") == 2
+    assert weather_upstream.count("forecast.json") == 0
+
+
+def test_district_ttl_expires_per_district(flask_app, weather_upstream):
+    service = flask_app.weather_service
+    service.get_districts(["Musanze", "Huye"])
+    snapshot, fetched_at = service._district_entries["Musanze"]
+    service._district_entries["Musanze"] = (snapshot, fetched_at - service.district_ttl - 1)
+
+    service.get_districts(["Musanze", "Huye"])
+    assert weather_upstream.count(name="Musanze") == 2
+    assert weather_upstream.count(name="Huye") == 1
+
+
+def test_district_endpoint(flask_app, weather_upstream):
+    client   = flask_app.app.test_client()
+    response = client.get("/api/weather/districts/huye")
+    assert response.status_code == 200
+    assert response.get_json()["name"] == "Huye"
+    assert weather_upstream.calls == [("current.json", "Huye")]
+
+
+def test_unknown_district_is_404(flask_app, weather_upstream):
+    response = flask_app.app.test_client().get("/api/weather/districts/Atlantis")
+    assert response.status_code == 404
+    assert "Musanze" in response.get_json()["districts"]
+    assert weather_upstream.count() == 0
+
+
+def test_upstream_failure_is_502(flask_app, weather_upstream):
+    weather_upstream.status["*"] = 500
+    response = flask_app.app.test_client().get("/api/weather/districts/Musanze")
+    assert response.status_code == 502
+    assert response.get_json()["name"] == "Musanze"
+
+
+@pytest.mark.parametrize("path, role", [("/dashboard", "farmer"), ("/agro-dealer-dashboard", "dealer")])
+def test_dashboard_weather_follows_the_picked_district(flask_app, weather_upstream, make_user,
+                                                      client_for, path, role):
+    client = client_for(make_user(role))
+    page   = client.get(f"{path}?district=musanze").get_data(as_text=True)
+    assert 'data-districts="Musanze"' in page
+    assert weather_upstream.calls == [("current.json", "Musanze")]
+
+    # Remembered for the session; clearing it goes back to every district
+    assert 'data-districts="Musanze"' in client.get(path).get_data(as_text=True)
+    assert "data-districts=" not in client.get(f"{path}?district=").get_data(as_text=True)
@@ -0,0 +1,63 @@
+"""Weather response caching: ETag per representation, 304s, gzip and fields=."""
+
+import gzip
+import time
+
+import pytest
+
+PAYLOAD = {
+    "error":     None,
+    "current":   {"temp_c": 21.0, "condition": "Partly cloudy"},
+    "districts": [{"name": f"District {i}", "temp_c": 20.0 + i / 10} for i in range(30)],
+}
+
+
+@pytest.fixture
+def client(flask_app, monkeypatch):
+    fetched_at = time.time()
+    monkeypatch.setattr(flask_app.weather_service, "cache_version", lambda: ("v1", fetched_at))
+    monkeypatch.setattr(flask_app, "localized_weather_snapshot", lambda **kwargs: dict(PAYLOAD))
+    return flask_app.app.test_client()
+
+
+def test_gzip_and_identity_bodies_have_different_etags(client):
+    plain  = client.get("/api/weather", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/api/weather", headers={"Accept-Encoding": "gzip"})
+    assert plain.status_code == zipped.status_code == 200
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] != zipped.headers["ETag"]
+    assert zipped.headers["ETag"].strip('"').endswith("-gz")
+    assert gzip.decompress(zipped.data) == plain.data
+    assert plain.headers["Vary"] == zipped.headers["Vary"] == "Accept-Encoding"
+
+
+def test_if_none_match_only_matches_the_representation_served(client):
+    zipped = client.get("/api/weather", headers={"Accept-Encoding": "gzip"})
+    plain  = client.get("/api/weather")
+
+    same = client.get("/api/weather", headers={"Accept-Encoding": "gzip",
+                                                "If-None-Match": zipped.headers["ETag"]})
+    assert same.status_code == 304
+    assert same.headers["ETag"] == zipped.headers["ETag"]
+    assert not same.data
+
+    # A cached identity body must not validate a gzip response (or the reverse)
+    assert client.get("/api/weather", headers={"Accept-Encoding": "gzip",
+                                               "If-None-Match": plain.headers["ETag"]}).status_code == 200
+    assert client.get("/api/weather", headers={"If-None-Match": zipped.headers["ETag"]}).status_code == 200
+    assert client.get("/api/weather", headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+
+
+def test_fields_projection_has_its_own_etag(client):
+    full    = client.get("/api/weather")
+    current = client.get("/api/weather?fields=current")
+    assert set(current.get_json()) == {"current", "error"}
+    assert current.headers["ETag"] != full.headers["ETag"]
+    assert client.get("/api/weather?fields=nope").status_code == 400
+
+
+def test_forced_refresh_is_not_cacheable(client):
+    response = client.get("/api/weather?refresh=1")
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
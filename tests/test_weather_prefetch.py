@@ -0,0 +1,129 @@
+"""WeatherPrefetcher: rolling rate budget, 429 pause and the shared-store lease, on a fake clock."""
+
+import time
+
+import pytest
+
+import services.weather as weather_module
+import services.weather_prefetch as prefetch_module
+import services.weather_store as store_module
+from services.weather import WeatherService
+from services.weather_prefetch import RATE_LIMIT_PAUSE, WeatherPrefetcher
+from services.weather_store import SQLWeatherStore
+
+CALLS_PER_MINUTE = 30
+ITEMS            = 31      # the forecast and 30 districts
+
+
+class FakeClock:
+    """Stands in for the `time` module: time() is simulated, everything else is real."""
+
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class FakeStop:
+    """The prefetcher's stop Event: wait() advances the clock instead of sleeping, until `until`."""
+
+    def __init__(self, clock, until):
+        self.clock, self.until, self._set = clock, until, False
+
+    def is_set(self):
+        return self._set
+
+    def set(self):
+        self._set = True
+
+    def clear(self):
+        self._set = False
+
+    def wait(self, seconds):
+        self.clock.now += seconds
+        if self.clock.now >= self.until:
+            self._set = True
+        return self._set
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    for module in (weather_module, prefetch_module, store_module):
+        monkeypatch.setattr(module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_service(clock, weather_session_factory):
+    def make(shared=None):
+        service       = WeatherService(shared=shared)
+        service._http = weather_session_factory(clock.time)
+        return service
+    return make
+
+
+def run_for(prefetcher, clock, seconds):
+    """Run the real prefetch loop for `seconds` of simulated time."""
+    prefetcher._stop = FakeStop(clock, clock.now + seconds)
+    prefetcher.start()
+    prefetcher._thread.join(timeout=30)
+    assert not prefetcher._thread.is_alive()
+
+
+def test_stays_under_the_call_budget(clock, make_service):
+    service    = make_service()
+    prefetcher = WeatherPrefetcher(service, calls_per_minute=CALLS_PER_MINUTE)
+    run_for(prefetcher, clock, 10 * 60)
+
+    times = service._http.times
+    # Warm-up touches every item once, then only the forecast comes due again (80% of 10 min)
+    assert len(times) == ITEMS + 1 == prefetcher.upstream_calls
+    assert min(b - a for a, b in zip(times, times[1:])) >= prefetcher.interval
+    for start in times:
+        assert sum(1 for t in times if start <= t < start + 60) <= CALLS_PER_MINUTE
+    assert service.freshness()["fresh_districts"] == 30
+
+
+def test_pauses_after_a_429(clock, make_service):
+    service    = make_service()
+    prefetcher = WeatherPrefetcher(service, calls_per_minute=CALLS_PER_MINUTE)
+    service._http.status["*"] = 429
+
+    run_for(prefetcher, clock, RATE_LIMIT_PAUSE - 1)
+    assert service._http.count() == 1
+    assert prefetcher.rate_limited == 1
+    assert prefetcher.paused_until == pytest.approx(service._http.times[0] + RATE_LIMIT_PAUSE)
+
+    # Past the pause it resumes
+    service._http.status.clear()
+    run_for(prefetcher, clock, 10)
+    assert service._http.count() > 1
+    assert service._http.times[1] >= prefetcher.paused_until
+
+
+def test_only_the_lease_holder_calls_upstream(clock, make_service, tmp_path):
+    store              = SQLWeatherStore.from_sqlite_path(str(tmp_path / "weather.db"))
+    leader, follower   = make_service(store), make_service(store)
+    first, second      = (WeatherPrefetcher(leader, calls_per_minute=CALLS_PER_MINUTE),
+                          WeatherPrefetcher(follower, calls_per_minute=CALLS_PER_MINUTE))
+
+    first._run("Musanze")
+    second._run("Musanze")
+    assert (first.role, second.role) == ("leader", "follower")
+    assert leader._http.count() == 1 and follower._http.count() == 0
+    # The follower copied the leader's result from the store
+    assert follower._district_entries["Musanze"][0]["name"] == "Musanze"
+
+    second._run("Huye")
+    assert follower._http.count() == 0 and "Huye" not in follower._district_entries
+
+    # The leader stops renewing; once its lease runs out the follower takes over
+    clock.now += first.interval * 4 + 1
+    second._run("Huye")
+    assert second.role == "leader"
+    assert follower._http.calls == [("current.json", "Huye")]
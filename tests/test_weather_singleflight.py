@@ -0,0 +1,92 @@
+"""Concurrent WeatherService cache misses share one upstream fetch (fake WeatherAPI over HTTP)."""
+
+import threading
+import time
+
+import pytest
+
+from scripts.fake_weatherapi import FakeWeatherAPI
+from services.weather import WeatherService
+
+CLIENTS  = 25
+FORECAST = "/v1/forecast.json"
+CURRENT  = "/v1/current.json"
+
+
+@pytest.fixture
+def upstream():
+    server = FakeWeatherAPI(latency=0.2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(upstream):
+    service = WeatherService()
+    service.API_URL          = f"{upstream.base_url}{FORECAST}"
+    service.DISTRICT_API_URL = f"{upstream.base_url}{CURRENT}"
+    return service
+
+
+def burst(call, clients=CLIENTS):
+    """Run `call` from `clients` threads released at the same instant."""
+    gate    = threading.Barrier(clients)
+    results = [None] * clients
+
+    def worker(i):
+        gate.wait()
+        results[i] = call()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def settle(service, timeout=30.0):
+    """Wait for any background refresh to finish."""
+    deadline = time.monotonic() + timeout
+    while service._refresh_done is not None and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_cold_cache(service, upstream):
+    results = burst(lambda: service.get_weather())
+    settle(service)
+    hits = upstream.reset()
+    assert hits[FORECAST] == 1
+    assert hits[CURRENT] == len(service.RWANDA_DISTRICTS)
+    assert not any(r.get("error") for r in results)
+
+
+def test_forced_refresh(service, upstream):
+    service.get_weather()
+    settle(service)
+    upstream.reset()
+
+    results = burst(lambda: service.get_weather(force_refresh=True))
+    hits    = upstream.reset()
+    assert hits[FORECAST] == 1
+    assert hits[CURRENT] == len(service.RWANDA_DISTRICTS)
+    assert not any(r.get("error") for r in results)
+
+
+def test_expired_soft_ttl(service, upstream):
+    service.get_weather()
+    settle(service)
+    upstream.reset()
+    service._cache_timestamp -= service.soft_ttl + 1
+
+    started = time.monotonic()
+    results = burst(lambda: service.get_weather(wait=0))
+    # Everyone got the stale payload straight away
+    assert time.monotonic() - started < upstream.latency
+    assert not any(r.get("error") for r in results)
+    settle(service)
+    hits = upstream.reset()
+    assert hits[FORECAST] == 1
+    assert hits[CURRENT] == 0    # districts are still inside their own TTL